@@ -0,0 +1,205 @@
+"""
+api/audit.py
+Asynchronous prediction audit log for the Mongo `predictions` collection.
+
+log() only appends to a bounded in-memory queue; a background thread
+drains it with unordered insert_many batches once PREDICTION_LOG_BATCH_SIZE
+documents are waiting or PREDICTION_LOG_FLUSH_INTERVAL seconds have passed,
+so serving a prediction never waits on a Mongo round trip. close() flushes
+whatever is still queued.
+
+When the queue is full the backpressure policy decides what gives:
+
+* drop_newest - the new document is discarded (default, never blocks)
+* drop_oldest - the oldest queued document is discarded
+* block       - the caller waits up to PREDICTION_LOG_BLOCK_TIMEOUT seconds
+                for room, then drops the document. Coroutines log through
+                alog(), which does that wait on a thread so only the
+                request waits, never the event loop
+
+Optional .env settings:
+
+PREDICTION_LOG_ENABLED=true           # false turns log() into a no-op
+PREDICTION_LOG_QUEUE_SIZE=10000       # max documents waiting to be written
+PREDICTION_LOG_BATCH_SIZE=500         # documents per insert_many
+PREDICTION_LOG_FLUSH_INTERVAL=1.0     # max seconds a document waits in the queue
+PREDICTION_LOG_POLICY=drop_newest     # drop_newest | drop_oldest | block
+PREDICTION_LOG_BLOCK_TIMEOUT=0.05     # seconds to wait for room with 'block'
+"""
+
+import os
+import time
+import atexit
+import asyncio
+import threading
+from collections import deque
+
+from pymongo.errors import BulkWriteError
+
+PREDICTION_LOG_ENABLED = os.getenv("PREDICTION_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+PREDICTION_LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", "10000"))
+PREDICTION_LOG_BATCH_SIZE = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", "500"))
+PREDICTION_LOG_FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", "1.0"))
+PREDICTION_LOG_POLICY = os.getenv("PREDICTION_LOG_POLICY", "drop_newest").lower()
+PREDICTION_LOG_BLOCK_TIMEOUT = float(os.getenv("PREDICTION_LOG_BLOCK_TIMEOUT", "0.05"))
+
+BACKPRESSURE_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+class PredictionLogger:
+    """Bounded queue + background batch writer for prediction audit documents"""
+
+    def __init__(self, collection, max_queue=PREDICTION_LOG_QUEUE_SIZE, batch_size=PREDICTION_LOG_BATCH_SIZE,
+                 flush_interval=PREDICTION_LOG_FLUSH_INTERVAL, policy=PREDICTION_LOG_POLICY,
+                 block_timeout=PREDICTION_LOG_BLOCK_TIMEOUT, enabled=PREDICTION_LOG_ENABLED):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"policy must be one of {BACKPRESSURE_POLICIES}, got {policy!r}")
+        self.collection = collection  # sync (pymongo) collection
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.enabled = enabled
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._in_flight = 0
+        self._flush_requested = False
+        self._counters = {
+            "logged": 0,
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "failed_documents": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def log(self, document):
+        """Queue one document; returns False if it was dropped"""
+        if not self.enabled:
+            return False
+        with self._cond:
+            if self._stopping:
+                self._counters["dropped"] += 1
+                return False
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_oldest":
+                    self._queue.popleft()
+                    self._counters["dropped"] += 1
+                elif self.policy == "block":
+                    self._cond.wait_for(lambda: len(self._queue) < self.max_queue, self.block_timeout)
+                if len(self._queue) >= self.max_queue:
+                    self._counters["dropped"] += 1
+                    return False
+            self._queue.append(document)
+            self._counters["logged"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        self._ensure_started()
+        return True
+
+    async def alog(self, document):
+        """log() for coroutines: with the 'block' policy the wait for room happens off the event loop"""
+        if self.policy == "block" and self.enabled:
+            return await asyncio.to_thread(self.log, document)
+        return self.log(document)
+
+    def log_many(self, documents):
+        return sum(self.log(document) for document in documents)
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None and not self._stopping:
+                    self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _take_batch(self):
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        self._cond.notify_all()  # wake producers blocked on a full queue
+        return batch
+
+    def _write(self, batch):
+        written = 0
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            written = len(batch)
+        except BulkWriteError as e:
+            # Unordered inserts keep going past a bad document
+            written = e.details.get("nInserted", 0)
+        except Exception as e:
+            print(f"⚠️ Prediction log write failed ({len(batch)} documents lost): {e}")
+        failed = len(batch) - written
+        with self._cond:
+            self._in_flight = 0
+            self._counters["batches"] += 1
+            self._counters["written"] += written
+            if failed:
+                self._counters["write_errors"] += 1
+                self._counters["failed_documents"] += failed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._stopping or self._flush_requested) and len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flush_requested = False
+                batch = self._take_batch()
+                self._in_flight = len(batch)
+                stopping = self._stopping and not self._queue
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def flush(self, timeout=10.0):
+        """Block until everything queued so far has been written (or timeout)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._cond:
+                if not self._queue and not self._in_flight:
+                    return
+                # Write now instead of waiting for the batch size / interval
+                self._flush_requested = True
+                self._cond.notify_all()
+            time.sleep(0.01)
+
+    def close(self, timeout=10.0):
+        """Stop the writer after flushing the queue"""
+        with self._cond:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            counters = dict(self._counters)
+            queued = len(self._queue)
+        return {
+            "enabled": self.enabled,
+            "policy": self.policy,
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_s": self.flush_interval,
+            **counters,
+        }
@@ -0,0 +1,151 @@
+"""
+api/batch_scoring.py
+Offline batch scoring of the `patients` table into Mongo `predictions`.
+
+Rows are streamed from MySQL through a server-side cursor (only the feature
+columns, patient_id and record_updated_at) in large chunks. Each chunk is
+encoded into one (n, 13) matrix, scored with one predict call and written
+with an unordered bulk_write of upserts keyed on (patient_id, model
+version), so rerunning a job - or overlapping incremental runs - rewrites
+documents instead of duplicating them.
+
+Chunks are processed by a small pool of threads while the cursor keeps
+reading, with a bounded number of chunks in flight. With workers > 1 the
+predict calls run in api.inference_pool worker processes (model loaded
+once per worker, matrices passed through shared memory), so scoring scales
+with cores and the reading thread never competes with the model for the GIL.
+
+Incremental runs (`since`) read rows with record_updated_at >= since
+through idx_patients_updated_at. A finished run stores the newest
+record_updated_at it scored in `sync_state`, per model version, and
+since="last" resumes from there.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import ReplaceOne
+from sqlalchemy import text
+
+from api.features import DB_COLUMNS, encode_rows
+from api.inference import classify, health_status, predict_proba_matrix
+from api.inference_pool import InferencePool
+
+SCORE_CHUNK_SIZE = 20000
+SCORE_KIND = "batch"
+SCORE_STATE_PREFIX = "batch_scoring"
+
+_COLUMNS = ", ".join(["patient_id", "record_updated_at", *DB_COLUMNS.values()])
+SCORE_ALL_PATIENTS = f"SELECT {_COLUMNS} FROM patients ORDER BY patient_id"
+SCORE_CHANGED_PATIENTS = f"""
+    SELECT {_COLUMNS} FROM patients
+    WHERE record_updated_at >= :since
+    ORDER BY record_updated_at, patient_id
+"""
+
+
+def prediction_documents(rows, probabilities, version, scored_at):
+    """Upserts for one scored chunk; the _id pins one document per patient and model version"""
+    operations = []
+    for row, probability, prediction in zip(rows, probabilities.tolist(), classify(probabilities).tolist()):
+        operations.append(ReplaceOne(
+            {"_id": f"{SCORE_KIND}:{row.patient_id}:{version}"},
+            {
+                "kind": SCORE_KIND,
+                "patient_id": row.patient_id,
+                "record_updated_at": row.record_updated_at,
+                "model_version": version,
+                "prediction": prediction,
+                "probability": probability,
+                "risk_level": health_status(prediction),
+                "timestamp": scored_at,
+                "source": "batch",
+            },
+            upsert=True,
+        ))
+    return operations
+
+
+def last_scored(state_collection, version):
+    """record_updated_at high-water mark of the previous run for `version` (None if never run)"""
+    state = state_collection.find_one({"_id": f"{SCORE_STATE_PREFIX}:{version}"})
+    return state["updated_at"] if state else None
+
+
+def score_patients(engine, collection, handle, state_collection=None, since=None,
+                   chunk_size=SCORE_CHUNK_SIZE, workers=1):
+    """
+    Score every patient (or those updated at/after `since`) with `handle`
+    and upsert the results into `collection`. `since="last"` resumes from
+    the mark of the previous run. Returns {"rows", "written", "seconds",
+    "rows_per_sec", "high_water_mark"}.
+    """
+    if since == "last":
+        since = last_scored(state_collection, handle.version) if state_collection is not None else None
+
+    pool = InferencePool(workers=workers) if workers > 1 else None
+    if pool:
+        pool.start(handle)
+        score = lambda X: pool.predict_raw(handle, X)
+    else:
+        score = lambda X: predict_proba_matrix(handle.model, X)
+
+    in_flight = threading.BoundedSemaphore(2 * max(workers, 1))
+    stats = {"rows": 0, "written": 0}
+    newest = [None]
+    lock = threading.Lock()
+    errors = []
+
+    def score_chunk(rows):
+        try:
+            probabilities = score(encode_rows(rows))
+            result = collection.bulk_write(
+                prediction_documents(rows, probabilities, handle.version, datetime.now()), ordered=False
+            )
+            chunk_newest = max(row.record_updated_at for row in rows)
+            with lock:
+                stats["written"] += result.upserted_count + result.modified_count
+                if newest[0] is None or chunk_newest > newest[0]:
+                    newest[0] = chunk_newest
+        except Exception as e:
+            errors.append(e)
+        finally:
+            in_flight.release()
+
+    if since is None:
+        query, params = text(SCORE_ALL_PATIENTS), {}
+    else:
+        query, params = text(SCORE_CHANGED_PATIENTS), {"since": since}
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query, params)
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as threads:
+                for rows in result.partitions(chunk_size):
+                    if errors:
+                        break
+                    in_flight.acquire()
+                    threads.submit(score_chunk, rows)
+                    stats["rows"] += len(rows)
+                    elapsed = time.perf_counter() - start
+                    print(f"✅  {stats['rows']:,} rows read, {stats['written']:,} written "
+                          f"({stats['rows'] / elapsed:,.0f} rows/sec)")
+    finally:
+        if pool:
+            pool.close()
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} chunks failed: {errors[0]}")
+    if state_collection is not None and newest[0] is not None:
+        state_collection.update_one(
+            {"_id": f"{SCORE_STATE_PREFIX}:{handle.version}"},
+            {"$set": {"updated_at": newest[0], "finished_at": datetime.now(), "rows": stats["rows"]}},
+            upsert=True,
+        )
+
+    elapsed = time.perf_counter() - start
+    return {**stats, "seconds": elapsed, "rows_per_sec": stats["rows"] / elapsed if elapsed else 0.0,
+            "high_water_mark": newest[0]}
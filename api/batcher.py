@@ -0,0 +1,138 @@
+"""
+api/batcher.py
+Micro-batching inference scheduler for concurrent single-patient requests.
+
+Rows submitted from different requests are collected for at most
+INFERENCE_BATCH_WINDOW_MS milliseconds (or until INFERENCE_BATCH_MAX_ROWS
+rows are waiting) and scored with one `model.predict` call; each waiting
+coroutine gets its own row's positive-class probability back (callers turn
+it into a class with inference.classify). Batches run on a single
+inference thread, so the event loop keeps accepting (and batching)
+requests while the model works and the model never sees concurrent calls.
+With a process-pool backend (api/inference_pool.py) one thread per worker
+process hands batches over, so several batches are scored in parallel.
+
+Rows are only batched with rows for the same ModelHandle, so a hot reload
+never mixes versions inside one predict call.
+
+Optional .env settings:
+
+INFERENCE_BATCH_WINDOW_MS=2      # max wait for more rows (0 disables micro-batching)
+INFERENCE_BATCH_MAX_ROWS=64      # flush as soon as this many rows are waiting
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from api.inference import predict_proba_matrix
+
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "2"))
+INFERENCE_BATCH_MAX_ROWS = int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "64"))
+
+
+def predict_in_thread(handle, X):
+    """Default scorer: the handle's model, called on the inference thread"""
+    return predict_proba_matrix(handle.model, X)
+
+
+class MicroBatcher:
+    """Collects rows for a short window and scores them with one predict call"""
+
+    def __init__(self, window_ms=INFERENCE_BATCH_WINDOW_MS, max_rows=INFERENCE_BATCH_MAX_ROWS,
+                 predict=predict_in_thread, threads=1):
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self.predict = predict  # predict(handle, X) -> array of probabilities
+        self.enabled = window_ms > 0 and max_rows > 1
+
+        self._pending = []  # (handle, row, future)
+        self._pending_rows = 0
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._counters = {"batches": 0, "rows": 0, "max_batch": 0, "full_flushes": 0, "timer_flushes": 0}
+
+    async def predict_rows(self, handle, X):
+        """Probabilities (float64 array) for the rows of an encoded matrix, batched with concurrent callers"""
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+        if not self.enabled or len(X) >= self.max_rows:
+            return np.asarray(await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._run_batch, handle, X
+            ), dtype=np.float64)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in X:
+            future = loop.create_future()
+            self._pending.append((handle, row, future))
+            futures.append(future)
+        self._pending_rows += len(X)
+
+        if self._pending_rows >= self.max_rows:
+            self._counters["full_flushes"] += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._on_timer)
+        return np.array(await asyncio.gather(*futures), dtype=np.float64)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._pending:
+            self._counters["timer_flushes"] += 1
+            self._flush()
+
+    def _flush(self):
+        """Hand everything pending to the inference thread, one predict per model handle"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+
+        groups = {}
+        for handle, row, future in pending:
+            groups.setdefault(id(handle), (handle, []))[1].append((row, future))
+        loop = asyncio.get_running_loop()
+        for handle, items in groups.values():
+            X = np.vstack([row for row, _ in items])
+            task = loop.run_in_executor(self._executor, self._run_batch, handle, X)
+            task.add_done_callback(lambda done, items=items: self._fan_out(done, items))
+
+    def _run_batch(self, handle, X):
+        predictions = self.predict(handle, X)
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["rows"] += len(X)
+            self._counters["max_batch"] = max(self._counters["max_batch"], len(X))
+        return predictions
+
+    @staticmethod
+    def _fan_out(done, items):
+        error = done.exception()
+        for i, (_, future) in enumerate(items):
+            if future.done():  # caller went away (request cancelled)
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        batches = counters["batches"]
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_rows": self.max_rows,
+            "pending": self._pending_rows,
+            "avg_batch": counters["rows"] / batches if batches else 0.0,
+            **counters,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,249 @@
+"""
+api/bulk.py
+Streaming bulk ingestion for POST /patients/bulk.
+
+The request body (NDJSON, or CSV with a header row using the API field
+names, e.g. data/heart.csv) is parsed line by line as it arrives. Rows are
+validated with the PatientCreate rules, the InsertPatient procedure's
+range checks and the schema's ENUM / reference-table values, and every
+`chunk_size` valid rows go to MySQL as one multi-row INSERT, so only one
+chunk is ever held in memory. If a chunk INSERT still fails on a row's data,
+the chunk is split in halves and retried until each bad row fails alone, so
+k bad rows cost about 2k*log2(chunk_size) extra INSERTs rather than one per
+row. Failed rows report the violated constraint, never the driver's text.
+
+Chunk predictions run in a worker thread (or through the API's inference
+batcher), never on the event loop.
+"""
+
+import asyncio
+import csv
+import json
+import re
+
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import column, table, text
+from sqlalchemy.exc import DataError, IntegrityError
+
+from api.features import CATEGORIES, encode_record
+from api.models import PATIENT_COLUMNS, PatientCreate
+
+BULK_CHUNK_SIZE = 1000
+MAX_BULK_CHUNK_SIZE = 10000
+
+# Allowed values of the patients ENUM columns and of the columns referencing
+# the dataset/cp/restecg/slope/thal tables (database/sql/schema.sql)
+REFERENCE_VALUES = {
+    "sex": CATEGORIES["sex"],
+    "dataset": ["Cleveland", "Hungary", "Switzerland", "VA Long Beach"],
+    "cp": CATEGORIES["cp"],
+    "fbs": CATEGORIES["fbs"],
+    "restecg": CATEGORIES["restecg"],
+    "exang": CATEGORIES["exang"],
+    "slope": CATEGORIES["slope"],
+    "thal": CATEGORIES["thal"],
+}
+
+# MySQL names the key or constraint in these error messages
+DUPLICATE_KEY = re.compile(r"Duplicate entry .* for key '([^']+)'")
+FOREIGN_KEY = re.compile(r"CONSTRAINT `([^`]+)`")
+
+patients_table = table("patients", *[column(name) for name in PATIENT_COLUMNS.values()])
+
+
+# ------------------------------------------------------------------
+# Parsing
+# ------------------------------------------------------------------
+async def iter_lines(byte_stream):
+    """Yield decoded lines from an async byte stream without buffering the body"""
+    buffer = b""
+    async for chunk in byte_stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_records(byte_stream, fmt):
+    """Yield (row_number, record, error) per data line; record is a dict or None"""
+    header = None
+    row_number = 0
+
+    async for line in iter_lines(byte_stream):
+        if not line.strip():
+            continue
+
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            row_number += 1
+            if len(values) != len(header):
+                yield row_number, None, f"expected {len(header)} columns, got {len(values)}"
+                continue
+            yield row_number, {k: (v if v != "" else None) for k, v in zip(header, values)}, None
+        else:
+            row_number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row_number, None, f"invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, None, "expected a JSON object"
+                continue
+            yield row_number, record, None
+
+
+# ------------------------------------------------------------------
+# Validation
+# ------------------------------------------------------------------
+def check_patient_ranges(patient):
+    """Same checks the InsertPatient stored procedure signals on; None if valid"""
+    if patient.age is None or patient.age <= 0:
+        return "Age must be positive"
+    if patient.age > 120:
+        return "Age seems unrealistic (>120)"
+    if patient.trestbps is not None and patient.trestbps <= 0:
+        return "Resting blood pressure must be positive"
+    if patient.chol is not None and patient.chol <= 0:
+        return "Cholesterol level must be positive"
+    if patient.thalch is not None and (patient.thalch <= 0 or patient.thalch > 250):
+        return "Max heart rate must be between 1 and 250"
+    return None
+
+
+def check_reference_values(patient):
+    """ENUM and foreign-key columns must hold a known value (or NULL); None if valid"""
+    for field, allowed in REFERENCE_VALUES.items():
+        value = getattr(patient, field)
+        if value is not None and value not in allowed:
+            return f"{field}: {value!r} is not one of {', '.join(allowed)}"
+    return None
+
+
+def validate_patient(record):
+    """Return (PatientCreate, None) for a valid record, else (None, error message)"""
+    try:
+        patient = PatientCreate.model_validate(record)
+    except ValidationError as exc:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()
+        )
+
+    error = check_patient_ranges(patient) or check_reference_values(patient)
+    return (None, error) if error else (patient, None)
+
+
+# ------------------------------------------------------------------
+# Insert
+# ------------------------------------------------------------------
+def insert_patients(session, patients):
+    """Insert patients with one multi-row INSERT and commit; returns their new ids"""
+    rows = [
+        {PATIENT_COLUMNS[field]: value for field, value in patient.model_dump().items()}
+        for patient in patients
+    ]
+    try:
+        session.execute(patients_table.insert().values(rows))
+        # A single multi-row INSERT gets consecutive AUTO_INCREMENT ids
+        first_id = session.execute(text("SELECT LAST_INSERT_ID()")).scalar()
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return list(range(first_id, first_id + len(rows)))
+
+
+def insert_error_message(exc):
+    """Client-safe reason for a failed row INSERT: the constraint, not the SQL"""
+    if isinstance(exc, IntegrityError):
+        message = str(exc.orig)
+        if match := DUPLICATE_KEY.search(message):
+            return f"insert failed: duplicate key {match.group(1)}"
+        if match := FOREIGN_KEY.search(message):
+            return f"insert failed: violates constraint {match.group(1)}"
+        return "insert failed: duplicate/constraint violation"
+    if isinstance(exc, DataError):
+        return "insert failed: value does not fit its column"
+    return "insert failed"
+
+
+async def ingest_patients(byte_stream, fmt, db, chunk_size=BULK_CHUNK_SIZE, predict=None):
+    """
+    Stream, validate and insert patients in chunks.
+
+    `db` is an AsyncDBSession; `predict`, if given, maps an encoded (n, 13)
+    feature matrix to a list of predictions and is called once per chunk;
+    a coroutine function is awaited, a plain function runs in a thread.
+    Returns a summary with one result (id or error) per input row.
+    """
+    results = []
+    pending = []  # (row_number, PatientCreate)
+    summary = {"inserted": 0, "failed": 0}
+
+    async def score(patients):
+        if predict is None:
+            return [None] * len(patients)
+        X = np.array([encode_record(p.model_dump()) for p in patients], dtype=np.float64)
+        if asyncio.iscoroutinefunction(predict):
+            return await predict(X)
+        return await asyncio.to_thread(predict, X)
+
+    def fail(rows, exc):
+        summary["failed"] += len(rows)
+        error = insert_error_message(exc)
+        results.extend({"row": n, "error": error} for n, _ in rows)
+
+    async def insert_bisected(rows):
+        """INSERT rows; on a data error split them in halves so only the offending rows fail"""
+        try:
+            ids = await db.run_sync(insert_patients, [patient for _, patient in rows])
+        except (IntegrityError, DataError) as exc:
+            if len(rows) == 1:
+                fail(rows, exc)
+                return []
+            middle = len(rows) // 2
+            return await insert_bisected(rows[:middle]) + await insert_bisected(rows[middle:])
+        except Exception as exc:
+            # Not caused by a row (e.g. lost connection): splitting would not help
+            fail(rows, exc)
+            return []
+        return [(n, patient, patient_id) for (n, patient), patient_id in zip(rows, ids)]
+
+    async def flush():
+        if not pending:
+            return
+        inserted = await insert_bisected(list(pending))  # (row_number, PatientCreate, id)
+        pending.clear()
+        if not inserted:
+            return
+
+        predictions = await score([patient for _, patient, _ in inserted])
+        for (n, _, patient_id), prediction in zip(inserted, predictions):
+            result = {"row": n, "id": patient_id}
+            if predict is not None:
+                result["prediction"] = prediction
+            results.append(result)
+        summary["inserted"] += len(inserted)
+
+    async for row_number, record, error in iter_records(byte_stream, fmt):
+        patient = None
+        if error is None:
+            patient, error = validate_patient(record)
+        if error is not None:
+            summary["failed"] += 1
+            results.append({"row": row_number, "error": error})
+            continue
+
+        pending.append((row_number, patient))
+        if len(pending) >= chunk_size:
+            await flush()
+
+    await flush()
+    results.sort(key=lambda result: result["row"])
+    return {**summary, "results": results}
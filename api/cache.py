@@ -0,0 +1,227 @@
+"""
+api/cache.py
+Prediction cache keyed by (patient_id, feature fingerprint, model_version).
+
+The fingerprint is a digest of the row's feature values, so a prediction
+stays valid exactly as long as the features and the model do. (Keying on
+record_updated_at is not enough: TIMESTAMP has one-second resolution, so
+an update within the same second would keep serving the old prediction.)
+API writes also invalidate the patient's entries. The in-process tier is
+an LRU bounded by size and TTL; an optional persisted tier lives in its
+own Mongo collection, expired by a TTL index on expires_at, so warm entries
+survive restarts and are shared between workers.
+
+Optional .env settings:
+
+PREDICTION_CACHE_SIZE=10000        # max entries kept in memory (0 disables the cache)
+PREDICTION_CACHE_TTL=3600          # seconds an entry stays valid
+PREDICTION_CACHE_PERSIST=false     # also read/write the Mongo `prediction_cache` collection
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReplaceOne
+
+from api.features import DB_COLUMNS, FEATURE_COLUMNS
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_PERSIST = os.getenv("PREDICTION_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+PREDICTION_CACHE_COLLECTION = "prediction_cache"
+
+_FEATURE_ATTRIBUTES = [DB_COLUMNS[name] for name in FEATURE_COLUMNS]
+
+
+def feature_fingerprint(patient):
+    """Short digest of a `patients` row's feature values"""
+    values = repr(tuple(getattr(patient, column) for column in _FEATURE_ATTRIBUTES))
+    return hashlib.blake2b(values.encode(), digest_size=8).hexdigest()
+
+
+def cache_key(patient, model_version):
+    """Cache key for a `patients` row scored by the given model version"""
+    return (patient.patient_id, feature_fingerprint(patient), model_version)
+
+
+class PredictionCache:
+    """LRU + TTL prediction cache with an optional async Mongo tier"""
+
+    def __init__(self, max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL, collection=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.collection = collection  # async Mongo collection, or None
+
+        # patient_id -> (fingerprint, model_version, prediction, expires_at)
+        # Only the newest version of a patient is ever useful, so one slot per
+        # patient makes invalidation O(1).
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "persisted_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "persist_errors": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # In-process tier
+    # ------------------------------------------------------------------
+    def _get_local(self, key):
+        patient_id, fingerprint, model_version = key
+        entry = self._entries.get(patient_id)
+        if entry is None or entry[0] != fingerprint or entry[1] != model_version:
+            return None
+        if entry[3] < time.monotonic():
+            del self._entries[patient_id]
+            self._counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(patient_id)
+        return entry[2]
+
+    def _put_local(self, key, prediction):
+        patient_id, fingerprint, model_version = key
+        self._entries[patient_id] = (fingerprint, model_version, prediction, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(patient_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def ensure_indexes(self):
+        """TTL index that lets Mongo expire persisted entries, plus patient_id for invalidation"""
+        if self.collection is None:
+            return
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            await self.collection.create_index("patient_id")
+        except Exception as e:
+            self._count_persist_error()
+            print(f"⚠️  Could not create prediction cache indexes: {e}")
+
+    async def get_many(self, keys):
+        """Return {key: prediction} for every key that is cached"""
+        if self.max_size <= 0:
+            return {}
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                prediction = self._get_local(key)
+                if prediction is not None:
+                    found[key] = prediction
+            self._counters["hits"] += len(found)
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.collection is not None:
+            persisted = await self._get_persisted(missing)
+            with self._lock:
+                for key, prediction in persisted.items():
+                    self._put_local(key, prediction)
+                self._counters["persisted_hits"] += len(persisted)
+            found.update(persisted)
+
+        with self._lock:
+            self._counters["misses"] += len(keys) - len(found)
+        return found
+
+    async def put_many(self, predictions):
+        """Cache {key: prediction} pairs"""
+        if self.max_size <= 0 or not predictions:
+            return
+
+        with self._lock:
+            for key, prediction in predictions.items():
+                self._put_local(key, prediction)
+
+        if self.collection is not None:
+            await self._put_persisted(predictions)
+
+    async def invalidate(self, patient_id):
+        """Drop every cached prediction for a patient (row created/updated/deleted)"""
+        with self._lock:
+            self._entries.pop(patient_id, None)
+            self._counters["invalidations"] += 1
+
+        if self.collection is not None:
+            try:
+                await self.collection.delete_many({"patient_id": patient_id})
+            except Exception:
+                self._count_persist_error()
+
+    def stats(self):
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["persisted_hits"] + counters["misses"]
+        return {
+            **counters,
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "persisted": self.collection is not None,
+            "hit_rate": (counters["hits"] + counters["persisted_hits"]) / lookups if lookups else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Persisted tier (Mongo `prediction_cache` collection)
+    # ------------------------------------------------------------------
+    def _count_persist_error(self):
+        with self._lock:
+            self._counters["persist_errors"] += 1
+
+    @staticmethod
+    def _doc_id(patient_id, model_version):
+        return f"{patient_id}:{model_version}"
+
+    async def _get_persisted(self, keys):
+        ids = {self._doc_id(patient_id, version): (patient_id, fingerprint, version)
+               for patient_id, fingerprint, version in keys}
+        try:
+            cursor = self.collection.find({
+                "_id": {"$in": list(ids)},
+                "expires_at": {"$gt": datetime.now(timezone.utc)},
+            })
+            docs = await cursor.to_list(length=None)
+        except Exception:
+            self._count_persist_error()
+            return {}
+
+        found = {}
+        for doc in docs:
+            key = ids[doc["_id"]]
+            if doc.get("fingerprint") == key[1]:
+                found[key] = doc["prediction"]
+        return found
+
+    async def _put_persisted(self, predictions):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        operations = [
+            ReplaceOne(
+                {"_id": self._doc_id(patient_id, version)},
+                {
+                    "patient_id": patient_id,
+                    "fingerprint": fingerprint,
+                    "model_version": version,
+                    "prediction": prediction,
+                    "expires_at": expires_at,
+                },
+                upsert=True,
+            )
+            for (patient_id, fingerprint, version), prediction in predictions.items()
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception:
+            self._count_persist_error()
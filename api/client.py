@@ -0,0 +1,197 @@
+"""
+api/client.py
+HTTP client for the Heart Disease Predictor API (used by the scripts).
+
+One client holds one pooled keep-alive connection pool, so repeated calls
+reuse TCP (and TLS) connections instead of opening one per request.
+Transient failures - connection errors, timeouts and 429/502/503/504
+responses - are retried with exponential backoff and jitter; a Retry-After
+header on the response (seconds or an HTTP date) is honoured instead.
+
+fetch_patients(ids, concurrency=N) keeps up to N requests in flight (threads
+over the shared pool for APIClient, a semaphore for AsyncAPIClient), so a
+list of patients costs roughly len(ids) / N round trips instead of
+len(ids). Results come back in the order of `ids`, None for unknown ids.
+
+Point base_url at any server speaking the same routes (e.g. a local stub),
+or pass an httpx `transport` (e.g. httpx.MockTransport), to exercise the
+client without the real API.
+
+Optional .env settings:
+
+API_BASE_URL=http://localhost:8000
+API_CLIENT_RETRIES=3          # retries after the first attempt
+API_CLIENT_BACKOFF=0.2        # seconds before the first retry, doubled each time
+API_CLIENT_TIMEOUT=10         # seconds per request
+"""
+
+import os
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_CLIENT_RETRIES = int(os.getenv("API_CLIENT_RETRIES", "3"))
+API_CLIENT_BACKOFF = float(os.getenv("API_CLIENT_BACKOFF", "0.2"))
+API_CLIENT_TIMEOUT = float(os.getenv("API_CLIENT_TIMEOUT", "10"))
+FETCH_CONCURRENCY = 16
+
+MAX_BACKOFF_SECONDS = 5.0
+MAX_RETRY_AFTER_SECONDS = 60.0
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class APIError(Exception):
+    """The API answered with an error, or could not be reached after all retries"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _backoff(attempt, base):
+    """Exponential backoff with jitter for retry number `attempt` (0-based)"""
+    return min(MAX_BACKOFF_SECONDS, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _retry_after(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None"""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def _retry_delay(response, attempt, base):
+    """Delay before retrying a retryable response: Retry-After if given, else backoff"""
+    delay = _retry_after(response)
+    return _backoff(attempt, base) if delay is None else delay
+
+
+def _patient_or_none(response, patient_id):
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise APIError(f"GET /patients/{patient_id} failed: {response.status_code} {response.text[:200]}",
+                       response.status_code)
+    return response.json()
+
+
+def _limits(concurrency):
+    return httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+
+class APIClient:
+    """Synchronous client over one pooled keep-alive httpx.Client (thread-safe)"""
+
+    def __init__(self, base_url=API_BASE_URL, concurrency=FETCH_CONCURRENCY, retries=API_CLIENT_RETRIES,
+                 backoff=API_CLIENT_BACKOFF, timeout=API_CLIENT_TIMEOUT, transport=None):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._client = httpx.Client(base_url=base_url, timeout=timeout, limits=_limits(concurrency),
+                                    transport=transport)
+
+    def get(self, path, **kwargs):
+        """GET with retries; returns the final response (any status) or raises APIError"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._client.get(path, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                delay = _retry_delay(response, attempt, self.backoff)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise APIError(f"GET {path} failed after {attempt + 1} attempts: {e}") from e
+                delay = _backoff(attempt, self.backoff)
+            time.sleep(delay)
+
+    def get_patient(self, patient_id):
+        """Patient dict (with prediction), or None if there is no such patient"""
+        return _patient_or_none(self.get(f"/patients/{patient_id}"), patient_id)
+
+    def latest_patient(self):
+        response = self.get("/patients/latest/data")
+        if response.status_code != 200:
+            raise APIError(f"GET /patients/latest/data failed: {response.status_code}", response.status_code)
+        return response.json()
+
+    def fetch_patients(self, ids, concurrency=None):
+        """Patients for `ids` in order (None for unknown ids), up to `concurrency` requests in flight"""
+        with ThreadPoolExecutor(max_workers=concurrency or self.concurrency) as pool:
+            return list(pool.map(self.get_patient, ids))
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncAPIClient:
+    """asyncio client over one pooled keep-alive httpx.AsyncClient"""
+
+    def __init__(self, base_url=API_BASE_URL, concurrency=FETCH_CONCURRENCY, retries=API_CLIENT_RETRIES,
+                 backoff=API_CLIENT_BACKOFF, timeout=API_CLIENT_TIMEOUT, transport=None):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._client = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=_limits(concurrency),
+                                         transport=transport)
+
+    async def get(self, path, **kwargs):
+        """GET with retries; returns the final response (any status) or raises APIError"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._client.get(path, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                delay = _retry_delay(response, attempt, self.backoff)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise APIError(f"GET {path} failed after {attempt + 1} attempts: {e}") from e
+                delay = _backoff(attempt, self.backoff)
+            await asyncio.sleep(delay)
+
+    async def get_patient(self, patient_id):
+        return _patient_or_none(await self.get(f"/patients/{patient_id}"), patient_id)
+
+    async def latest_patient(self):
+        response = await self.get("/patients/latest/data")
+        if response.status_code != 200:
+            raise APIError(f"GET /patients/latest/data failed: {response.status_code}", response.status_code)
+        return response.json()
+
+    async def fetch_patients(self, ids, concurrency=None):
+        """Patients for `ids` in order (None for unknown ids), up to `concurrency` requests in flight"""
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+
+        async def fetch(patient_id):
+            async with semaphore:
+                return await self.get_patient(patient_id)
+
+        return list(await asyncio.gather(*(fetch(patient_id) for patient_id in ids)))
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,135 @@
+"""
+api/export.py
+Streaming export of the full patients table (GET /patients/export).
+
+Rows are read through a server-side cursor (`stream_results`) in fixed-size
+chunks; each chunk is scored with one predict call and serialized as
+NDJSON, CSV or Arrow IPC before the next one is fetched, so memory stays
+flat no matter how large the table is. The generators are synchronous and
+Starlette iterates them on its thread pool, off the event loop.
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy import text
+
+from api.features import encode_rows
+from api.inference import health_status
+from api.models import PATIENT_COLUMNS
+from api.queries import SELECT_ALL_PATIENTS
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional, only needed for format=arrow
+    pa = None
+
+EXPORT_CHUNK_SIZE = 5000
+MAX_EXPORT_CHUNK_SIZE = 50000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Export column (API name) -> DB column
+EXPORT_COLUMNS = {"id": "patient_id", **PATIENT_COLUMNS, "created_at": "record_created_at"}
+
+
+def iter_chunks(engine, chunk_size, predict=None):
+    """Yield lists of export dicts, one server-side cursor partition at a time"""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            text(SELECT_ALL_PATIENTS)
+        )
+        for rows in result.partitions(chunk_size):
+            items = [
+                {field: getattr(row, column) for field, column in EXPORT_COLUMNS.items()}
+                for row in rows
+            ]
+            if predict is not None:
+                for item, prediction in zip(items, predict(encode_rows(rows))):
+                    item["prediction"] = prediction
+                    item["health_status"] = health_status(prediction)
+            yield items
+
+
+def _json_default(value):
+    """Serialize datetimes the same way the JSON endpoints do"""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def export_ndjson(chunks):
+    for items in chunks:
+        yield "".join(json.dumps(item, default=_json_default) + "\n" for item in items).encode()
+
+
+def export_csv(chunks, include_prediction):
+    header = list(EXPORT_COLUMNS) + (["prediction", "health_status"] if include_prediction else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=header)
+    writer.writeheader()
+    for items in chunks:
+        writer.writerows(items)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def arrow_schema(include_prediction):
+    fields = [
+        ("id", pa.int64()), ("age", pa.int64()), ("sex", pa.string()), ("dataset", pa.string()),
+        ("cp", pa.string()), ("trestbps", pa.int64()), ("chol", pa.int64()), ("fbs", pa.string()),
+        ("restecg", pa.string()), ("thalch", pa.int64()), ("exang", pa.string()),
+        ("oldpeak", pa.float64()), ("slope", pa.string()), ("ca", pa.int64()), ("thal", pa.string()),
+        ("num", pa.int64()), ("created_at", pa.timestamp("s")),
+    ]
+    if include_prediction:
+        fields += [("prediction", pa.int64()), ("health_status", pa.string())]
+    return pa.schema(fields)
+
+
+def export_arrow(chunks, include_prediction):
+    schema = arrow_schema(include_prediction)
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for items in chunks:
+        columns = {name: [item.get(name) for item in items] for name in schema.names}
+        writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_patients(engine, fmt, chunk_size=EXPORT_CHUNK_SIZE, predict=None):
+    """Byte-chunk generator for the requested format ('ndjson', 'csv' or 'arrow')"""
+    chunks = iter_chunks(engine, chunk_size, predict)
+    if fmt == "csv":
+        return export_csv(chunks, predict is not None)
+    if fmt == "arrow":
+        return export_arrow(chunks, predict is not None)
+    return export_ndjson(chunks)
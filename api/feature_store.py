@@ -0,0 +1,206 @@
+"""
+api/feature_store.py
+Memory-mapped columnar feature store for the patient dataset.
+
+A build converts data/heart.csv (or a snapshot of the MySQL `patients`
+table) into a directory with one .npy file per column:
+
+* model features hold exactly what features.encode_column produces -
+  categorical codes and numerics with defaults imputed - so
+  FeatureStore.feature_matrix() is the model input without any parsing
+* every other column keeps its values: integers and floats as is, text as
+  int16 codes into a category list kept in the manifest (-1 for NULL)
+* <column>.nulls.npy is a packed bitmap of the source NULLs, and the
+  manifest counts non-NULL values the encoder did not recognise
+
+Readers open the files with mmap_mode="r", so scripts share the page cache
+instead of re-parsing text. manifest.json records a content hash of every
+source column and a fingerprint of the encoder tables; a rebuild re-encodes
+and rewrites only the columns where either one changed, and skips even the
+parse when the source file is unchanged. Files are replaced atomically and
+the manifest is written last.
+"""
+
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from api.features import CATEGORIES, FALLBACK_CODES, FEATURE_COLUMNS, LOOKUP_TABLES, NUMERIC_DEFAULTS, encode_column
+from api.models import PATIENT_COLUMNS
+
+FEATURE_STORE_PATH = os.path.join("data", "heart.features")
+STORE_FORMAT = 1
+MANIFEST = "manifest.json"
+SNAPSHOT_CHUNK_SIZE = 10000
+
+SNAPSHOT_QUERY = "SELECT patient_id AS id, {columns} FROM patients ORDER BY patient_id".format(
+    columns=", ".join(f"{column} AS {name}" for name, column in PATIENT_COLUMNS.items())
+)
+
+
+def _column_hash(series):
+    """Content hash of a source column (values and NULLs, not the index)"""
+    return hashlib.sha256(pd.util.hash_pandas_object(series, index=False).values.tobytes()).hexdigest()[:16]
+
+
+def _encoder_fingerprint(name):
+    """Changes whenever the encoding of column `name` would"""
+    spec = [STORE_FORMAT, CATEGORIES.get(name), FALLBACK_CODES.get(name), NUMERIC_DEFAULTS.get(name)]
+    return hashlib.sha256(json.dumps(spec).encode()).hexdigest()[:16]
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def encode_store_column(name, series):
+    """(values, nulls, meta) for one source column"""
+    nulls = series.isna().to_numpy()
+    meta = {"nulls": int(nulls.sum()), "invalid": 0}
+
+    if name in LOOKUP_TABLES:
+        values = encode_column(name, series)
+        known = series[~nulls].astype(str).isin(list(LOOKUP_TABLES[name]))
+        meta["invalid"] = int((~known).sum())
+        meta.update(kind="feature", categories=CATEGORIES[name])
+    elif name in NUMERIC_DEFAULTS:
+        numeric = pd.to_numeric(series, errors="coerce")
+        meta["invalid"] = int((numeric.isna().to_numpy() & ~nulls).sum())
+        values = encode_column(name, numeric)
+        meta.update(kind="feature")
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy()
+        meta.update(kind="value")
+    else:
+        codes, categories = pd.factorize(series.astype("string"), sort=True)
+        values = codes.astype(np.int16)
+        meta.update(kind="category", categories=[str(c) for c in categories])
+
+    return values, nulls, meta
+
+
+def _save_array(path, array):
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path=FEATURE_STORE_PATH):
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == STORE_FORMAT else None
+
+
+def build_feature_store(df, out=FEATURE_STORE_PATH, source=None):
+    """
+    Write the columns of `df` (API field names) to the store at `out`,
+    re-encoding only columns whose content or encoder changed.
+    Returns {"rows", "encoded", "skipped", "seconds"}.
+    """
+    start = time.perf_counter()
+    os.makedirs(out, exist_ok=True)
+    previous = load_manifest(out) or {"columns": {}}
+    same_rows = previous.get("rows") == len(df)
+
+    columns, encoded, skipped = {}, [], []
+    for name in df.columns:
+        series = df[name]
+        source_hash, encoder = _column_hash(series), _encoder_fingerprint(name)
+        old = previous["columns"].get(name)
+        if (same_rows and old and old["source_hash"] == source_hash and old["encoder"] == encoder
+                and os.path.exists(os.path.join(out, f"{name}.npy"))):
+            columns[name] = old
+            skipped.append(name)
+            continue
+
+        values, nulls, meta = encode_store_column(name, series)
+        _save_array(os.path.join(out, f"{name}.npy"), values)
+        _save_array(os.path.join(out, f"{name}.nulls.npy"), np.packbits(nulls))
+        columns[name] = {**meta, "dtype": str(values.dtype), "source_hash": source_hash, "encoder": encoder}
+        encoded.append(name)
+
+    manifest = {"format": STORE_FORMAT, "rows": len(df), "source": source, "columns": columns,
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    tmp_path = os.path.join(out, MANIFEST + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out, MANIFEST))
+
+    for name in set(previous["columns"]) - set(columns):  # columns gone from the source
+        for suffix in (".npy", ".nulls.npy"):
+            try:
+                os.remove(os.path.join(out, name + suffix))
+            except OSError:
+                pass
+    return {"rows": len(df), "encoded": encoded, "skipped": skipped, "seconds": time.perf_counter() - start}
+
+
+def build_from_csv(csv_path, out=FEATURE_STORE_PATH, force=False):
+    """Build (or refresh) the store from a CSV; a no-op when the file is unchanged"""
+    signature = {"kind": "csv", **_file_signature(csv_path)}
+    manifest = load_manifest(out)
+    if not force and manifest and manifest.get("source") == signature:
+        return {"rows": manifest["rows"], "encoded": [], "skipped": list(manifest["columns"]), "seconds": 0.0}
+    return build_feature_store(pd.read_csv(csv_path), out, signature)
+
+
+def build_from_mysql(engine, out=FEATURE_STORE_PATH, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """Snapshot the `patients` table into the store (streamed through a server-side cursor)"""
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        df = pd.concat(pd.read_sql(text(SNAPSHOT_QUERY), conn, chunksize=chunk_size), ignore_index=True)
+    source = {"kind": "mysql", "url": engine.url.render_as_string(hide_password=True),
+              "snapshot_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    return build_feature_store(df, out, source)
+
+
+class FeatureStore:
+    """Read-only, memory-mapped view of a built store"""
+
+    def __init__(self, path=FEATURE_STORE_PATH):
+        self.path = path
+        self.manifest = load_manifest(path)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No feature store at {path}; build one with scripts/build_feature_store.py")
+        self.rows = self.manifest["rows"]
+        self.columns = list(self.manifest["columns"])
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """Stored values of `name` as a read-only memmap (no copy)"""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def nulls(self, name):
+        """Boolean NULL mask of the source column"""
+        packed = np.load(os.path.join(self.path, f"{name}.nulls.npy"), mmap_mode="r")
+        return np.unpackbits(packed, count=self.rows).astype(bool)
+
+    def null_counts(self):
+        return {name: meta["nulls"] for name, meta in self.manifest["columns"].items()}
+
+    def info(self, name):
+        return self.manifest["columns"][name]
+
+    def decoded(self, name):
+        """Category labels of a text column (None for NULL)"""
+        meta = self.info(name)
+        labels = np.array(meta["categories"] + [None], dtype=object)
+        codes = self.column(name)
+        if meta["kind"] == "feature":
+            codes = np.where(self.nulls(name), -1, codes).astype(np.int64)
+        return labels[codes]
+
+    def feature_matrix(self):
+        """(n, 13) float64 model input, identical to features.encode_columns on the source"""
+        return np.column_stack([self.column(name) for name in FEATURE_COLUMNS])
@@ -0,0 +1,136 @@
+"""
+api/features.py
+Shared feature encoder for the heart disease model.
+
+Lookup tables are compiled once at import, so encoding a patient is a
+handful of dict lookups (scalar path) or one np.unique + gather per column
+(columnar path). Unknown or NULL values never raise: categoricals map to
+FALLBACK_CODES and missing numerics to NUMERIC_DEFAULTS (the same defaults
+scripts/preprocess_and_load.py imputes when loading the CSV).
+"""
+
+import numpy as np
+
+from api.models import PATIENT_COLUMNS
+
+# Model input order (API / CSV field names)
+FEATURE_COLUMNS = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+    "thalch", "exang", "oldpeak", "slope", "ca", "thal",
+]
+
+# API field name -> column of the `patients` table, for the model inputs
+# (every patient column except the data source and the diagnosis)
+DB_COLUMNS = {name: column for name, column in PATIENT_COLUMNS.items() if name not in ("dataset", "num")}
+
+# Category values in code order (code = list index)
+CATEGORIES = {
+    "sex": ["Female", "Male"],
+    "cp": ["typical angina", "atypical angina", "non-anginal", "asymptomatic"],
+    "fbs": ["FALSE", "TRUE"],
+    "restecg": ["normal", "st-t abnormality", "lv hypertrophy"],
+    "exang": ["FALSE", "TRUE"],
+    "slope": ["upsloping", "flat", "downsloping"],
+    "thal": ["normal", "fixed defect", "reversable defect"],
+}
+
+# Code used for unknown / NULL categories
+FALLBACK_CODES = {
+    "sex": 0,        # anything but "Male" was always encoded as 0
+    "cp": 3,         # asymptomatic, the most frequent value in data/heart.csv
+    "fbs": 0,        # FALSE
+    "restecg": 0,    # normal
+    "exang": 0,      # FALSE
+    "slope": 1,      # flat
+    "thal": 0,       # normal
+}
+
+# Value used for NULL / NaN numerics
+NUMERIC_DEFAULTS = {
+    "age": 50,
+    "trestbps": 120,
+    "chol": 200,
+    "thalch": 150,
+    "oldpeak": 0.0,
+    "ca": 0,
+}
+
+_BOOLEAN_ALIASES = {
+    1: [True, 1, "1", "1.0", "T", "t", "YES", "Yes", "yes"],
+    0: [False, 0, "0", "0.0", "F", "f", "NO", "No", "no"],
+}
+
+
+def _compile_lookup(name, values):
+    """Map every accepted spelling of each category straight to its code."""
+    table = {}
+    for code, value in enumerate(values):
+        for variant in (value, value.lower(), value.upper(), value.title()):
+            table[variant] = code
+    if name in ("fbs", "exang"):
+        for code, aliases in _BOOLEAN_ALIASES.items():
+            for alias in aliases:
+                table[alias] = code
+    return table
+
+
+LOOKUP_TABLES = {name: _compile_lookup(name, values) for name, values in CATEGORIES.items()}
+
+_ROW_ATTRIBUTES = [(name, DB_COLUMNS[name]) for name in FEATURE_COLUMNS]
+
+
+# ------------------------------------------------------------------
+# Scalar path
+# ------------------------------------------------------------------
+def encode_value(name, value):
+    """Encode a single feature value; never raises for unknown/NULL input."""
+    table = LOOKUP_TABLES.get(name)
+    if table is not None:
+        try:
+            return table.get(value, FALLBACK_CODES[name])
+        except TypeError:  # unhashable
+            return FALLBACK_CODES[name]
+
+    if value is None or value != value:  # NULL or NaN
+        return NUMERIC_DEFAULTS[name]
+    return float(value)
+
+
+def encode_record(record):
+    """Encode a dict keyed by API field names (age, sex, cp, ...)."""
+    return [encode_value(name, record.get(name)) for name in FEATURE_COLUMNS]
+
+
+def encode_row(row):
+    """Encode a `SELECT * FROM patients` result row."""
+    return [encode_value(name, getattr(row, column)) for name, column in _ROW_ATTRIBUTES]
+
+
+def encode_rows(rows):
+    """Encode a sequence of `patients` rows into an (n, 13) float matrix."""
+    return np.array([encode_row(row) for row in rows], dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+
+
+# ------------------------------------------------------------------
+# Columnar path
+# ------------------------------------------------------------------
+def encode_column(name, values):
+    """Encode one column (list / ndarray / pandas Series) into float64 codes."""
+    if name in LOOKUP_TABLES:
+        values = np.asarray(values, dtype=object)
+        uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+        table, fallback = LOOKUP_TABLES[name], FALLBACK_CODES[name]
+        codes = np.array([table.get(u, fallback) for u in uniques], dtype=np.float64)
+        return codes[inverse.reshape(-1)]
+
+    column = np.asarray(values, dtype=object).astype(np.float64)
+    column[np.isnan(column)] = NUMERIC_DEFAULTS[name]
+    return column
+
+
+def encode_columns(columns):
+    """
+    Encode a column mapping keyed by API field names (a dict of arrays or a
+    pandas DataFrame) into an (n, 13) float matrix in model input order.
+    """
+    return np.column_stack([encode_column(name, columns[name]) for name in FEATURE_COLUMNS])
@@ -0,0 +1,54 @@
+"""
+api/inference.py
+Batched feature encoding + model inference for rows of the `patients` table.
+
+A whole result set is encoded into one (n, 13) feature matrix and scored
+with a single `model.predict` call, so the per-call overhead of the model
+is paid once per page instead of once per patient.
+"""
+
+import numpy as np
+
+from api.features import encode_rows
+
+# Probability at or above which every endpoint and prediction script reports class 1
+PREDICTION_THRESHOLD = 0.5
+
+
+def build_feature_matrix(patients):
+    """Encode a sequence of `patients` rows into one (n, 13) feature matrix."""
+    return encode_rows(patients)
+
+
+def predict_batch(model, patients):
+    """Score every row with one `model.predict` call; returns a list of ints."""
+    if len(patients) == 0:
+        return []
+
+    return predict_matrix(model, build_feature_matrix(patients))
+
+
+def predict_matrix(model, X):
+    """Score an already encoded (n, 13) feature matrix; returns a list of 0/1 ints."""
+    if len(X) == 0:
+        return []
+
+    return classify(predict_proba_matrix(model, X)).tolist()
+
+
+def predict_proba_matrix(model, X):
+    """Positive-class probabilities for an encoded (n, 13) matrix as a float64 array."""
+    if len(X) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    return np.asarray(model.predict(X), dtype=np.float64).reshape(len(X), -1)[:, 0]
+
+
+def classify(probabilities, threshold=PREDICTION_THRESHOLD):
+    """0/1 classes for an array of probabilities."""
+    return (np.asarray(probabilities) >= threshold).astype(np.int64)
+
+
+def health_status(prediction):
+    """Human readable label for a model prediction."""
+    return "Healthy ✅" if prediction == 0 else "At Risk (Heart Disease) ⚠️"
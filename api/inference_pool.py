@@ -0,0 +1,211 @@
+"""
+api/inference_pool.py
+Optional process-pool inference backend.
+
+With INFERENCE_BACKEND=process the model runs in INFERENCE_WORKERS worker
+processes instead of on a thread of the API process, so CPU-bound predict
+calls run in parallel across cores and the API process only does I/O.
+
+* Each worker loads and warms up the model once (pool initializer) and
+  keeps it for its lifetime. After a hot reload the first task naming the
+  new version makes the worker load that file; the sha256 prefix is checked
+  so a worker never scores with a different model than the API reports.
+  Workers keep the WORKER_MODEL_VERSIONS most recent versions, so requests
+  still in flight for the previous model are scored by it. A version the
+  worker does not have and can no longer read from disk (the file was
+  replaced) is scored in the API process with the handle's own model.
+* Feature matrices of INFERENCE_SHM_MIN_ROWS rows or more travel through a
+  multiprocessing.shared_memory segment: the API process writes the (n, 13)
+  float64 matrix once, the worker maps it as an ndarray without copying and
+  writes the n outputs back into the same segment. Only the segment name and
+  shape are pickled. Smaller batches are cheaper to pickle than to map.
+
+Workers are started with the "spawn" method, so they do not inherit the API
+process's threads, sockets or connection pools.
+
+Optional .env settings:
+
+INFERENCE_BACKEND=thread        # thread (default) | process
+INFERENCE_WORKERS=4             # worker processes (default: CPU count)
+INFERENCE_SHM_MIN_ROWS=256      # batches at least this big use shared memory
+"""
+
+import os
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from api.features import FEATURE_COLUMNS, NUMERIC_DEFAULTS, encode_record
+from api.inference import classify
+from api.registry import deserialize_model, model_version
+
+INFERENCE_BACKENDS = ("thread", "process")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or os.cpu_count() or 1
+INFERENCE_SHM_MIN_ROWS = int(os.getenv("INFERENCE_SHM_MIN_ROWS", "256"))
+
+# Model versions a worker keeps loaded (the current one and the one before it)
+WORKER_MODEL_VERSIONS = 2
+
+# Worker process state: version -> loaded model, least recently used first
+_worker_models = OrderedDict()
+
+
+class ModelVersionMismatch(RuntimeError):
+    """The model file no longer holds the version a task asked for"""
+
+
+def _load_worker_model(path, version):
+    """Load + warm up `path` in this worker unless `version` is already loaded"""
+    model = _worker_models.get(version)
+    if model is not None:
+        _worker_models.move_to_end(version)
+        return model
+    with open(path, "rb") as f:
+        model_bytes = f.read()
+    found = model_version(model_bytes)
+    if found != version:
+        raise ModelVersionMismatch(f"{path} is now model version {found}, expected {version}")
+    model = deserialize_model(path, model_bytes)
+    model.predict(np.array([encode_record(NUMERIC_DEFAULTS)], dtype=np.float64))
+    _worker_models[version] = model
+    while len(_worker_models) > WORKER_MODEL_VERSIONS:
+        _worker_models.popitem(last=False)
+    return model
+
+
+def _init_worker(path, version):
+    # One model load per worker, before the first task arrives. A failure
+    # here would break the whole pool, so it is left to the first task to
+    # raise (and report) it instead.
+    try:
+        _load_worker_model(path, version)
+    except Exception as e:
+        print(f"⚠️ Inference worker could not preload model {version}: {e}")
+
+
+def _raw_predict(model, X):
+    """First output column of model.predict as a float64 vector"""
+    return np.asarray(model.predict(X), dtype=np.float64).reshape(len(X), -1)[:, 0]
+
+
+def _predict_pickled(path, version, X):
+    return _raw_predict(_load_worker_model(path, version), X)
+
+
+def _predict_shared(path, version, shm_name, n):
+    """Score the matrix in segment `shm_name`; outputs go to the n floats after it"""
+    model = _load_worker_model(path, version)
+    # Workers share the API process's resource tracker, which already
+    # tracks the segment; the API process unlinks it when the call returns
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X, out = _segment_views(shm.buf, n)
+        out[:] = _raw_predict(model, X)
+        del X, out  # release the buffer exports before close()
+    finally:
+        shm.close()
+
+
+def _segment_views(buf, n):
+    """(n, 13) input matrix and n-long output vector over one shared buffer"""
+    width = len(FEATURE_COLUMNS)
+    X = np.ndarray((n, width), dtype=np.float64, buffer=buf)
+    out = np.ndarray((n,), dtype=np.float64, buffer=buf, offset=X.nbytes)
+    return X, out
+
+
+class InferencePool:
+    """Runs model.predict for ModelHandles in a pool of worker processes"""
+
+    def __init__(self, workers=INFERENCE_WORKERS, shm_min_rows=INFERENCE_SHM_MIN_ROWS):
+        self.workers = workers
+        self.shm_min_rows = shm_min_rows
+        self._executor = None
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "rows": 0, "shared_memory_calls": 0, "in_process_fallbacks": 0}
+
+    def start(self, handle):
+        """Start the workers, each loading and warming up `handle`'s model"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(handle.path, handle.version),
+                )
+        # Spawn every worker now rather than on the first requests
+        for future in [self._executor.submit(_load_worker_model, handle.path, handle.version)
+                       for _ in range(self.workers)]:
+            future.result()
+
+    def predict_raw(self, handle, X):
+        """First output column for an (n, 13) matrix, computed in a worker; blocks"""
+        n = len(X)
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+        try:
+            raw, shared = self._predict_in_worker(handle, X)
+            fallback = 0
+        except ModelVersionMismatch:
+            # An older model still in flight after a hot reload whose file is
+            # gone; the handle holds that model, so score it here
+            raw, shared = _raw_predict(handle.model, X), 0
+            fallback = 1
+
+        with self._lock:
+            self._counters["calls"] += 1
+            self._counters["rows"] += n
+            self._counters["shared_memory_calls"] += shared
+            self._counters["in_process_fallbacks"] += fallback
+        return raw
+
+    def _predict_in_worker(self, handle, X):
+        """(outputs, 1 if shared memory was used else 0)"""
+        if self._executor is None:
+            self.start(handle)
+        # Workers hold the bare model only; scaling happens here
+        if handle.preprocessor is not None:
+            X = handle.preprocessor.transform(X)
+
+        n = len(X)
+        if n < self.shm_min_rows:
+            return self._executor.submit(_predict_pickled, handle.path, handle.version, X).result(), 0
+
+        shm = shared_memory.SharedMemory(create=True, size=n * (len(FEATURE_COLUMNS) + 1) * 8)
+        try:
+            X_shared, out = _segment_views(shm.buf, n)
+            X_shared[:] = X
+            self._executor.submit(_predict_shared, handle.path, handle.version, shm.name, n).result()
+            raw = out.copy()
+            del X_shared, out
+        finally:
+            shm.close()
+            shm.unlink()
+        return raw, 1
+
+    def predict(self, handle, X):
+        """Same result as inference.predict_matrix(handle.model, X), computed in a worker"""
+        return classify(self.predict_raw(handle, X)).tolist()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "backend": "process",
+            "workers": self.workers,
+            "started": self._executor is not None,
+            "shm_min_rows": self.shm_min_rows,
+            **counters,
+        }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
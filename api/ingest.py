@@ -0,0 +1,208 @@
+"""
+api/ingest.py
+Parallel, resumable CSV -> MySQL ingestion.
+
+The CSV is split into byte-range partitions of roughly `chunk_size` rows,
+each aligned to a line start. A process pool loads partitions concurrently
+(every worker process has its own connections) and each partition is one
+transaction of idempotent upserts keyed on the CSV `id` column
+(INSERT ... ON DUPLICATE KEY UPDATE). The parent records every committed
+partition in a JSON checkpoint file, so a rerun after a crash skips
+straight to the partitions that are still missing. Because the writes are
+upserts, replaying a partition that committed just before the checkpoint
+was saved is harmless, and no DELETE of the existing table is needed.
+
+Assumes one record per line (no quoted newlines), which holds for the
+heart-disease CSVs.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from sqlalchemy import text
+
+from api.loader import LOAD_CHUNK_SIZE, chunk_params, clean_chunk
+from api.models import PATIENT_COLUMNS
+
+INGEST_WORKERS = 4
+SAMPLE_LINES = 1000  # lines read to estimate bytes per row
+
+_ID_COLUMN = "id"
+
+
+def upsert_statement():
+    """
+    executemany upsert keyed on patient_id; the driver batches it into
+    multi-row INSERTs. Uses the row alias form (MySQL 8.0.19+), since
+    VALUES(col) in ON DUPLICATE KEY UPDATE is deprecated.
+    """
+    columns = ["patient_id"] + list(PATIENT_COLUMNS.values())
+    updates = ", ".join(f"{c} = new.{c}" for c in PATIENT_COLUMNS.values())
+    return text(
+        f"INSERT INTO patients ({', '.join(columns)}) "
+        f"VALUES ({', '.join(':' + c for c in columns)}) AS new "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+# ------------------------------------------------------------------
+# Partitioning
+# ------------------------------------------------------------------
+def read_header(csv_path):
+    """(column names, byte offset of the first data line)"""
+    with open(csv_path, "rb") as handle:
+        line = handle.readline()
+        # Same CSV rules as the partitions (quoting), minus a UTF-8 BOM
+        names = next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")], skipinitialspace=True), [])
+        return [name.strip() for name in names], handle.tell()
+
+
+def csv_partitions(csv_path, chunk_size=LOAD_CHUNK_SIZE):
+    """
+    [(start, end), ...] byte ranges covering every data line once, each
+    starting on a line boundary and holding about `chunk_size` rows.
+    """
+    size = os.path.getsize(csv_path)
+    _, data_start = read_header(csv_path)
+
+    with open(csv_path, "rb") as handle:
+        handle.seek(data_start)
+        sample = [handle.readline() for _ in range(SAMPLE_LINES)]
+        sample = [line for line in sample if line]
+        if not sample:
+            return []
+        target = max(1, sum(map(len, sample)) // len(sample) * chunk_size)
+
+        partitions = []
+        start = data_start
+        while start < size:
+            handle.seek(min(start + target, size))
+            if handle.tell() < size:
+                handle.readline()  # move to the next line boundary
+            end = min(handle.tell(), size)
+            partitions.append((start, end))
+            start = end
+    return partitions
+
+
+def read_partition(csv_path, columns, start, end):
+    """DataFrame of the lines in [start, end)"""
+    with open(csv_path, "rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    return pd.read_csv(io.BytesIO(data), names=columns, header=None)
+
+
+# ------------------------------------------------------------------
+# Checkpoint
+# ------------------------------------------------------------------
+def default_checkpoint_path(csv_path):
+    return csv_path + ".checkpoint.json"
+
+
+def _file_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"csv": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(path, csv_path, chunk_size):
+    """Completed partition starts from a checkpoint for this exact file, else an empty set"""
+    if not os.path.exists(path):
+        return set()
+    with open(path) as handle:
+        checkpoint = json.load(handle)
+    expected = {**_file_signature(csv_path), "chunk_size": chunk_size}
+    if any(checkpoint.get(key) != value for key, value in expected.items()):
+        print(f"⚠️  Ignoring checkpoint {path}: written for a different file or chunk size")
+        return set()
+    return set(checkpoint.get("done", []))
+
+
+def save_checkpoint(path, csv_path, chunk_size, done):
+    """Atomically replace the checkpoint file"""
+    checkpoint = {**_file_signature(csv_path), "chunk_size": chunk_size, "done": sorted(done)}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as handle:
+        json.dump(checkpoint, handle)
+    os.replace(tmp_path, path)
+
+
+# ------------------------------------------------------------------
+# Workers
+# ------------------------------------------------------------------
+def _init_worker():
+    """Drop connections inherited from the parent; each process opens its own"""
+    from api.database import engine
+
+    engine.dispose(close=False)
+
+
+def load_partition(csv_path, columns, start, end):
+    """Clean and upsert one partition in a single transaction; returns (start, rows)"""
+    from api.database import engine
+
+    chunk = read_partition(csv_path, columns, start, end)
+    cleaned = clean_chunk(chunk)
+    cleaned.insert(0, "patient_id", chunk[_ID_COLUMN].astype("int64").to_numpy())
+    with engine.begin() as conn:
+        conn.execute(upsert_statement(), chunk_params(cleaned))
+    return start, len(cleaned)
+
+
+def ingest_csv(csv_path, chunk_size=LOAD_CHUNK_SIZE, workers=INGEST_WORKERS, checkpoint_path=None):
+    """
+    Upsert `csv_path` into `patients` with `workers` processes, resuming
+    from `checkpoint_path` (default: <csv>.checkpoint.json). The checkpoint
+    is removed once every partition has committed.
+    Returns {"rows", "seconds", "rows_per_sec", "partitions", "skipped"}.
+    """
+    checkpoint_path = checkpoint_path or default_checkpoint_path(csv_path)
+    columns, _ = read_header(csv_path)
+    if _ID_COLUMN not in columns:
+        raise ValueError(f"{csv_path} has no '{_ID_COLUMN}' column to upsert on")
+
+    partitions = csv_partitions(csv_path, chunk_size)
+    done = load_checkpoint(checkpoint_path, csv_path, chunk_size)
+    pending = [(start, end) for start, end in partitions if start not in done]
+    if done:
+        print(f"↩️  Resuming: {len(partitions) - len(pending)}/{len(partitions)} partitions already loaded")
+
+    loaded = 0
+    failures = []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(load_partition, csv_path, columns, start, end) for start, end in pending]
+        for future in as_completed(futures):
+            try:
+                start, rows = future.result()
+            except Exception as e:
+                # Keep recording the partitions that do commit; rerun to retry the rest
+                failures.append(e)
+                continue
+            done.add(start)
+            save_checkpoint(checkpoint_path, csv_path, chunk_size, done)
+            loaded += rows
+            elapsed = time.perf_counter() - start_time
+            print(f"✅  {len(done)}/{len(partitions)} partitions, {loaded:,} rows "
+                  f"({loaded / elapsed:,.0f} rows/sec)")
+
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} partitions failed (progress saved to {checkpoint_path}): {failures[0]}"
+        )
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "rows": loaded,
+        "seconds": elapsed,
+        "rows_per_sec": loaded / elapsed if elapsed else 0.0,
+        "partitions": len(partitions),
+        "skipped": len(partitions) - len(pending),
+    }
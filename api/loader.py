@@ -0,0 +1,252 @@
+"""
+api/loader.py
+Vectorized, chunked CSV -> MySQL loader for the heart-disease dataset.
+
+The CSV is read `chunk_size` rows at a time (pd.read_csv(chunksize=...)),
+every chunk is cleaned with whole-column operations (same defaults the old
+row-by-row clean_data_for_db applied) and inserted with one executemany,
+which the MySQL driver sends as multi-row INSERTs. Memory is bounded by the
+chunk size, not the file size.
+
+fast_load_csv is the opt-in fast path: chunks go in as large multi-row
+`INSERT ... VALUES` statements or through a temp file and
+`LOAD DATA LOCAL INFILE`. It can also switch off the per-row
+after_patient_insert audit trigger and backfill patient_logs in one
+set-based statement at the end.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import column, create_engine, table, text
+from sqlalchemy.pool import NullPool
+
+from api.features import NUMERIC_DEFAULTS
+from api.models import PATIENT_COLUMNS
+
+LOAD_CHUNK_SIZE = 10_000
+
+# Imputed when a value is missing or unparseable
+INT_DEFAULTS = {
+    "age": NUMERIC_DEFAULTS["age"],
+    "trestbps": NUMERIC_DEFAULTS["trestbps"],
+    "chol": NUMERIC_DEFAULTS["chol"],
+    "thalch": NUMERIC_DEFAULTS["thalch"],
+    "ca": NUMERIC_DEFAULTS["ca"],
+    "num": 0,
+}
+FLOAT_DEFAULTS = {"oldpeak": NUMERIC_DEFAULTS["oldpeak"]}
+CATEGORY_DEFAULTS = {"restecg": "normal", "slope": "flat", "thal": "normal"}
+BOOLEAN_COLUMNS = ["fbs", "exang"]
+TRUTHY = ["TRUE", "1", "1.0", "T", "YES"]
+
+# Passed through as-is (NULL when missing)
+TEXT_COLUMNS = ["sex", "dataset", "cp"]
+
+CSV_COLUMNS = list(PATIENT_COLUMNS)
+
+FAST_LOAD_METHODS = ("values", "infile")
+VALUES_BATCH_ROWS = 5000  # rows per INSERT ... VALUES statement (keep under max_allowed_packet)
+
+# Session variable checked by the after_patient_insert trigger
+# (database/sql/migrations/002_patient_log_trigger_switch.sql)
+DISABLE_PATIENT_LOG = "@disable_patient_log"
+
+
+def _is_missing(series):
+    """NaN/None, or the literal string 'nan' (any case)"""
+    return series.isna() | (series.astype(str).str.lower() == "nan")
+
+
+def clean_chunk(df):
+    """
+    Clean one CSV chunk (API/CSV column names) with column operations and
+    return a frame keyed by `patients` column names, ready to insert.
+    """
+    out = pd.DataFrame(index=df.index)
+
+    for name, default in INT_DEFAULTS.items():
+        values = pd.to_numeric(df[name], errors="coerce")
+        out[name] = np.trunc(values.fillna(default)).astype(np.int64)
+
+    for name, default in FLOAT_DEFAULTS.items():
+        out[name] = pd.to_numeric(df[name], errors="coerce").fillna(default).astype(np.float64)
+
+    for name, default in CATEGORY_DEFAULTS.items():
+        out[name] = df[name].astype(object).where(~_is_missing(df[name]), default).astype(str)
+
+    for name in BOOLEAN_COLUMNS:
+        truthy = df[name].astype(str).str.upper().isin(TRUTHY)
+        out[name] = np.where(truthy, "TRUE", "FALSE")
+
+    for name in TEXT_COLUMNS:
+        out[name] = df[name].astype(object).where(~_is_missing(df[name]), None)
+
+    return out[CSV_COLUMNS].rename(columns=PATIENT_COLUMNS)
+
+
+def insert_statement(explicit_ids):
+    columns = (["patient_id"] if explicit_ids else []) + list(PATIENT_COLUMNS.values())
+    return text(
+        f"INSERT INTO patients ({', '.join(columns)}) "
+        f"VALUES ({', '.join(':' + c for c in columns)})"
+    )
+
+
+def chunk_params(cleaned):
+    """Native-Python parameter dicts (NULL for missing) for executemany"""
+    return cleaned.astype(object).where(cleaned.notna(), None).to_dict("records")
+
+
+def iter_clean_chunks(csv_path, chunk_size=LOAD_CHUNK_SIZE, explicit_ids=False, first_id=1):
+    """Yield cleaned DataFrames of at most `chunk_size` rows"""
+    next_id = first_id
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        cleaned = clean_chunk(chunk)
+        if explicit_ids:
+            cleaned.insert(0, "patient_id", np.arange(next_id, next_id + len(cleaned)))
+        next_id += len(cleaned)
+        yield cleaned
+
+
+def load_csv(csv_path, session_factory, chunk_size=LOAD_CHUNK_SIZE, explicit_ids=False, dry_run=False):
+    """
+    Load `csv_path` into `patients` chunk by chunk; each chunk commits on its
+    own. `explicit_ids` numbers rows 1..n instead of using AUTO_INCREMENT and
+    `dry_run` only cleans (useful to measure parsing throughput).
+    Returns {"rows": n, "seconds": s, "rows_per_sec": r}.
+    """
+    statement = insert_statement(explicit_ids)
+    session = None if dry_run else session_factory()
+    loaded = 0
+    start = time.perf_counter()
+
+    try:
+        for cleaned in iter_clean_chunks(csv_path, chunk_size, explicit_ids):
+            if session is not None:
+                session.execute(statement, chunk_params(cleaned))
+                session.commit()
+            loaded += len(cleaned)
+            elapsed = time.perf_counter() - start
+            print(f"✅  {loaded:,} rows ({loaded / elapsed:,.0f} rows/sec)")
+    except Exception:
+        if session is not None:
+            session.rollback()
+        raise
+    finally:
+        if session is not None:
+            session.close()
+
+    elapsed = time.perf_counter() - start
+    return {"rows": loaded, "seconds": elapsed, "rows_per_sec": loaded / elapsed if elapsed else 0.0}
+
+
+# ------------------------------------------------------------------
+# Fast path
+# ------------------------------------------------------------------
+def _chunk_table(cleaned):
+    return table("patients", *[column(name) for name in cleaned.columns])
+
+
+def insert_values(conn, cleaned):
+    """Insert a cleaned chunk as multi-row INSERT ... VALUES statements"""
+    target = _chunk_table(cleaned)
+    params = chunk_params(cleaned)
+    for start in range(0, len(params), VALUES_BATCH_ROWS):
+        conn.execute(target.insert().values(params[start:start + VALUES_BATCH_ROWS]))
+
+
+def insert_infile(conn, cleaned):
+    """Insert a cleaned chunk through a temp CSV file and LOAD DATA LOCAL INFILE"""
+    fd, path = tempfile.mkstemp(suffix=".csv", prefix="patients_load_")
+    try:
+        with os.fdopen(fd, "w", newline="") as handle:
+            # \N is MySQL's NULL marker in LOAD DATA files
+            cleaned.to_csv(handle, header=False, index=False, na_rep="\\N", lineterminator="\n")
+        conn.execute(text(
+            "LOAD DATA LOCAL INFILE :path INTO TABLE patients CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+            f"({', '.join(cleaned.columns)})"
+        ), {"path": path})
+    finally:
+        os.remove(path)
+
+
+def backfill_patient_logs(conn, after_id, last_id):
+    """One INSERT ... SELECT writing the 'INSERT' audit rows the trigger skipped"""
+    result = conn.execute(text(
+        "INSERT INTO patient_logs (patient_id, action_type) "
+        "SELECT patient_id, 'INSERT' FROM patients "
+        "WHERE patient_id > :after_id AND patient_id <= :last_id"
+    ), {"after_id": after_id, "last_id": last_id})
+    return result.rowcount
+
+
+def _max_patient_id(conn):
+    return conn.execute(text("SELECT COALESCE(MAX(patient_id), 0) FROM patients")).scalar()
+
+
+def fast_load_csv(csv_path, engine, chunk_size=LOAD_CHUNK_SIZE, method="values",
+                  defer_logs=False, explicit_ids=False):
+    """
+    Opt-in fast load of `csv_path` into `patients` on one connection.
+
+    method='values' sends VALUES_BATCH_ROWS-row INSERT statements;
+    method='infile' uses LOAD DATA LOCAL INFILE (needs local_infile=ON on
+    the server; the client flag is set here). With `defer_logs` the audit
+    trigger is switched off for this connection and patient_logs is
+    backfilled for every id above the pre-load MAX(patient_id), including
+    after a failure, so it is meant for bulk loads without concurrent writers.
+    If that cleanup itself fails after a failed load (e.g. the connection
+    died), the load's exception is raised and the backfill is left to be run
+    by hand with backfill_patient_logs(conn, after_id, MAX(patient_id)).
+    Returns {"rows": n, "seconds": s, "rows_per_sec": r, "logged": m}.
+    """
+    if method not in FAST_LOAD_METHODS:
+        raise ValueError(f"method must be one of {FAST_LOAD_METHODS}, got {method!r}")
+    if method == "infile":
+        engine = create_engine(engine.url, connect_args={"local_infile": True}, poolclass=NullPool)
+    insert_chunk = insert_values if method == "values" else insert_infile
+
+    loaded = logged = 0
+    start = time.perf_counter()
+
+    with engine.connect() as conn:
+        after_id = _max_patient_id(conn)
+        if defer_logs:
+            conn.execute(text(f"SET {DISABLE_PATIENT_LOG} = 1"))
+        failed = True
+        try:
+            for cleaned in iter_clean_chunks(csv_path, chunk_size, explicit_ids, first_id=after_id + 1):
+                insert_chunk(conn, cleaned)
+                conn.commit()
+                loaded += len(cleaned)
+                elapsed = time.perf_counter() - start
+                print(f"✅  {loaded:,} rows ({loaded / elapsed:,.0f} rows/sec)")
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception as e:
+                print(f"⚠️  Rollback after a failed load also failed: {e}")
+            raise
+        else:
+            failed = False
+        finally:
+            if defer_logs:
+                try:
+                    conn.execute(text(f"SET {DISABLE_PATIENT_LOG} = NULL"))
+                    logged = backfill_patient_logs(conn, after_id, _max_patient_id(conn))
+                    conn.commit()
+                except Exception as e:
+                    if not failed:
+                        raise
+                    # Keep the load's own error; the connection is likely gone
+                    print(f"⚠️  patient_logs backfill skipped after the failed load ({e}); "
+                          f"run backfill_patient_logs(conn, {after_id}, MAX(patient_id)) once the server is back")
+
+    elapsed = time.perf_counter() - start
+    return {"rows": loaded, "seconds": elapsed,
+            "rows_per_sec": loaded / elapsed if elapsed else 0.0, "logged": logged}
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from typing import List, Optional
 from datetime import datetime
@@ -7,49 +7,132 @@ import numpy as np
 from pydantic import BaseModel
 
 # Import your existing models and database functions
-from api.models import PatientCreate, PatientUpdate
-from api.database import get_mysql_db, get_mongo_db, test_connections
-
-import os
-import pickle
-
-# Load ML model
-model_path = os.path.join("models", "heart_disease_model.h5.pkl")
-with open(model_path, "rb") as f:
-    model = pickle.load(f)
+from api.models import (
+    PATIENT_COLUMNS, BatchPredictionResponse, PatientCreate, PatientUpdate, PredictionRequest, PredictionResponse,
+)
+from api.database import (
+    engine, AsyncDBSession, async_mongo_db, mongo_db, get_async_mysql_db, get_pool_metrics, test_connections, close_connections
+)
+from api.inference import build_feature_matrix, classify, health_status
+from api.bulk import BULK_CHUNK_SIZE, MAX_BULK_CHUNK_SIZE, ingest_patients
+from api import export, scoring
+from api.pagination import SORT_KEYS, decode_cursor, encode_cursor
+from api.queries import (
+    DELETE_PATIENT, DELETE_PATIENT_LOGS, RESPONSE_COLUMNS, SELECT_LATEST_PATIENT, SELECT_PATIENT_BY_ID,
+    UPDATE_PATIENT, list_patients_query,
+)
+from api.features import encode_columns, encode_record
+from api.cache import PredictionCache, PREDICTION_CACHE_COLLECTION, PREDICTION_CACHE_PERSIST, cache_key
+from api.audit import PredictionLogger
+from api.registry import MODEL_RELOAD_INTERVAL, ModelRegistry
+from api.batcher import MicroBatcher
+from api.inference_pool import INFERENCE_BACKEND, INFERENCE_BACKENDS, InferencePool
+
+import asyncio
+import threading
+
+# ML model: loaded lazily (warmed up in the startup hook), hot-reloadable
+model_registry = ModelRegistry()
+_model_watch_stop = threading.Event()
+
+prediction_cache = PredictionCache(
+    collection=async_mongo_db[PREDICTION_CACHE_COLLECTION] if PREDICTION_CACHE_PERSIST else None
+)
+
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    raise ValueError(f"INFERENCE_BACKEND must be one of {INFERENCE_BACKENDS}, got {INFERENCE_BACKEND!r}")
+
+# INFERENCE_BACKEND=process: the model runs in worker processes, off the GIL
+inference_pool = InferencePool() if INFERENCE_BACKEND == "process" else None
+
+# Concurrent single-row predictions are coalesced into one predict call
+inference_batcher = (
+    MicroBatcher(predict=inference_pool.predict_raw, threads=inference_pool.workers)
+    if inference_pool else MicroBatcher()
+)
+
+# Served predictions are queued here and written to Mongo in the background
+prediction_log = PredictionLogger(mongo_db["predictions"])
 
 app = FastAPI(title="Heart Disease Predictor API", version="1.0.0")
 
 # Updated Patient response model
 class Patient(BaseModel):
     id: int
-    age: int
-    sex: str
-    dataset: str
-    cp: str
-    trestbps: int
-    chol: int
-    fbs: str
-    restecg: str
-    thalch: int
-    exang: str
-    oldpeak: float
-    slope: str
-    ca: int
-    thal: str
-    num: int
-    created_at: datetime
+    age: Optional[int] = None
+    sex: Optional[str] = None
+    dataset: Optional[str] = None
+    cp: Optional[str] = None
+    trestbps: Optional[int] = None
+    chol: Optional[int] = None
+    fbs: Optional[str] = None
+    restecg: Optional[str] = None
+    thalch: Optional[int] = None
+    exang: Optional[str] = None
+    oldpeak: Optional[float] = None
+    slope: Optional[str] = None
+    ca: Optional[int] = None
+    thal: Optional[str] = None
+    num: Optional[int] = None
+    created_at: Optional[datetime] = None
     prediction: Optional[int] = None
     health_status: Optional[str] = None
+    model_version: Optional[str] = None
 
     class Config:
         from_attributes = True
+        protected_namespaces = ()
+
+class PatientProjection(BaseModel):
+    """Patient row with only the requested fields set (GET /patients/)"""
+    id: int
+    age: Optional[int] = None
+    sex: Optional[str] = None
+    dataset: Optional[str] = None
+    cp: Optional[str] = None
+    trestbps: Optional[int] = None
+    chol: Optional[int] = None
+    fbs: Optional[str] = None
+    restecg: Optional[str] = None
+    thalch: Optional[int] = None
+    exang: Optional[str] = None
+    oldpeak: Optional[float] = None
+    slope: Optional[str] = None
+    ca: Optional[int] = None
+    thal: Optional[str] = None
+    num: Optional[int] = None
+    created_at: Optional[datetime] = None
+    prediction: Optional[int] = None
+    health_status: Optional[str] = None
+    model_version: Optional[str] = None
+
+    class Config:
+        protected_namespaces = ()
 
 @app.on_event("startup")
 async def startup_event():
-    """Test database connections on startup"""
+    """Test database connections and load + warm up the model on startup"""
     if not test_connections():
         raise Exception("Failed to connect to databases")
+    await prediction_cache.ensure_indexes()
+    handle = await asyncio.to_thread(model_registry.get)
+    if inference_pool:
+        await asyncio.to_thread(inference_pool.start, handle)
+    if MODEL_RELOAD_INTERVAL > 0:
+        threading.Thread(
+            target=model_registry.watch, args=(MODEL_RELOAD_INTERVAL, _model_watch_stop),
+            name="model-watcher", daemon=True,
+        ).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush the prediction log, then release database connections on shutdown"""
+    _model_watch_stop.set()
+    await asyncio.to_thread(prediction_log.close)
+    await asyncio.to_thread(inference_batcher.close)
+    if inference_pool:
+        await asyncio.to_thread(inference_pool.close)
+    await close_connections()
 
 @app.get("/")
 async def root():
@@ -60,12 +143,115 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now()}
 
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Prediction cache hit/miss counters"""
+    return prediction_cache.stats()
+
+@app.get("/metrics/predictions")
+async def prediction_log_metrics():
+    """Prediction audit-log queue depth, writes and drops"""
+    return prediction_log.stats()
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+    """Micro-batching window, batch count and average batch size, plus the inference backend"""
+    backend = inference_pool.stats() if inference_pool else {"backend": "thread"}
+    return {**inference_batcher.stats(), "backend": backend}
+
+@app.get("/model")
+async def model_info():
+    """Loaded model version, source file and reload counters"""
+    return model_registry.info()
+
+@app.post("/model/reload")
+async def reload_model(path: Optional[str] = None):
+    """
+    Load the model file again (or `path`) and swap it in atomically; requests
+    already running finish on the previous model. A failed load keeps the
+    current model serving.
+    """
+    try:
+        handle = await asyncio.to_thread(model_registry.reload, path)
+    except Exception as e:
+        raise HTTPException(status_code=409, detail=f"Model reload failed: {e}")
+    return handle.info()
+
+async def current_model():
+    """The current ModelHandle; a first (lazy) load runs off the event loop"""
+    if model_registry.loaded:
+        return model_registry.get()
+    try:
+        return await asyncio.to_thread(model_registry.get)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Model unavailable: {e}")
+
+@app.get("/metrics/db")
+async def db_metrics():
+    """MySQL connection pool occupancy, checkout wait and pre-ping failures"""
+    return get_pool_metrics()
+
+# -------------------
+# Prediction Endpoints (raw features, no database round trip)
+# -------------------
+
+@app.post("/predict", response_model=PredictionResponse)
+async def predict_record(record: PredictionRequest):
+    """Score one raw feature record (micro-batched with concurrent requests)"""
+    handle = await current_model()
+    X = np.array([encode_record(record.model_dump())], dtype=np.float64)
+    probability = float((await inference_batcher.predict_rows(handle, X))[0])
+    prediction = int(classify(probability))
+    return PredictionResponse(
+        prediction=prediction,
+        probability=probability,
+        health_status=health_status(prediction),
+        model_version=handle.version,
+    )
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_records(request: Request):
+    """
+    Score up to PREDICT_BATCH_MAX_ROWS raw feature rows in one vectorized
+    call. The body is JSON records (a list, or {"records": [...]}), JSON
+    columns ({"columns": {"age": [...], ...}}) or an Arrow IPC stream.
+    Results are columnar and in request order.
+    """
+    content_type = request.headers.get("content-type", "")
+    if scoring.ARROW_MEDIA_TYPE in content_type and scoring.pa is None:
+        raise HTTPException(status_code=501, detail="Arrow bodies require pyarrow to be installed")
+
+    try:
+        columns, n = scoring.parse_payload(await request.body(), content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n > scoring.PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {scoring.PREDICT_BATCH_MAX_ROWS} rows per request, got {n}"
+        )
+
+    handle = await current_model()
+    try:
+        # Encoding runs off the event loop; small batches share a micro-batch,
+        # large ones go straight to the inference thread / worker process
+        X = await asyncio.to_thread(encode_columns, columns)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid feature values: {e}")
+    probabilities = await inference_batcher.predict_rows(handle, X)
+
+    return BatchPredictionResponse(
+        count=n,
+        predictions=classify(probabilities).tolist(),
+        probabilities=probabilities.tolist(),
+        model_version=handle.version,
+    )
+
 # -------------------
 # MySQL CRUD Endpoints
 # -------------------
 
 @app.post("/patients/", response_model=Patient)
-async def create_patient(patient: PatientCreate, db: Session = Depends(get_mysql_db)):
+async def create_patient(patient: PatientCreate, db: AsyncDBSession = Depends(get_async_mysql_db)):
     try:
         query = text("""
             CALL InsertPatient(
@@ -74,7 +260,7 @@ async def create_patient(patient: PatientCreate, db: Session = Depends(get_mysql
             )
         """)
 
-        db.execute(query, {
+        await db.execute(query, {
             "patient_id": None,  # for auto_increment
             "age": patient.age,
             "sex": patient.sex,
@@ -92,39 +278,177 @@ async def create_patient(patient: PatientCreate, db: Session = Depends(get_mysql
             "thal": patient.thal,
             "num": patient.num
         })
-        db.commit()
+        await db.commit()
 
-        last_id_result = db.execute(text("SELECT LAST_INSERT_ID()"))
+        last_id_result = await db.execute(text("SELECT LAST_INSERT_ID()"))
         patient_id = last_id_result.scalar()
 
         if patient_id is None:
             raise HTTPException(status_code=400, detail="Could not retrieve inserted patient ID")
 
+        await prediction_cache.invalidate(patient_id)
+
         return await get_patient(patient_id, db)
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating patient: {str(e)}")
 
-@app.get("/patients/", response_model=List[Patient])
-async def get_patients(skip: int = 0, limit: int = 100, db: Session = Depends(get_mysql_db)):
+@app.post("/patients/bulk")
+async def bulk_create_patients(
+    request: Request,
+    format: Optional[str] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    include_predictions: bool = False,
+    db: AsyncDBSession = Depends(get_async_mysql_db),
+):
+    """
+    Stream NDJSON (default) or CSV (`format=csv` or a text/csv body) and insert
+    valid rows in multi-row chunks. Returns an id or an error for every row.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+
+    predict = None
+    if include_predictions:
+        handle = await current_model()
+        predict = batcher_predict(handle)
     try:
-        result = db.execute(
-            text("SELECT * FROM patients LIMIT :limit OFFSET :skip"),
-            {"limit": limit, "skip": skip}
+        summary = await ingest_patients(
+            request.stream(), fmt, db,
+            chunk_size=max(1, min(chunk_size, MAX_BULK_CHUNK_SIZE)),
+            predict=predict,
         )
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8: {e}")
+    if include_predictions:
+        summary["model_version"] = handle.version
+    return summary
+
+@app.get("/patients/", response_model=List[PatientProjection], response_model_exclude_unset=True)
+async def get_patients(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    dataset: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    cp: Optional[str] = None,
+    num: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    include_prediction: bool = True,
+    db: AsyncDBSession = Depends(get_async_mysql_db),
+):
+    """
+    Page through patients. Pass the X-Next-Cursor header of one page as
+    `cursor` to fetch the next one (keyset seek, constant cost at any depth);
+    `skip` (LIMIT/OFFSET) still works for compatibility.
+
+    Filters (dataset, min_age/max_age, cp, num, created_after/created_before)
+    run in SQL. `fields=id,age,...` selects only those columns and
+    `include_prediction=false` skips model inference entirely.
+    """
+    after = None
+    if cursor:
+        try:
+            sort, after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(SORT_KEYS)}")
+
+    requested = list(RESPONSE_COLUMNS)
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(requested) - set(RESPONSE_COLUMNS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        if "id" not in requested:
+            requested.insert(0, "id")
+
+    sql, params = list_patients_query(
+        sort, after, requested, include_prediction,
+        dataset=dataset, min_age=min_age, max_age=max_age, cp=cp, num=num,
+        created_after=created_after, created_before=created_before,
+    )
+
+    try:
+        result = await db.execute(text(sql), {**params, "limit": limit, "skip": skip})
         patients = result.fetchall()
+
+        if patients and len(patients) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(sort, patients[-1])
+
+        version = None
+        predictions = [None] * len(patients)
+        if include_prediction:
+            handle = await current_model()
+            version = handle.version
+            predictions = await predict_patients(patients, handle)
+        return [
+            project_patient(p, requested, prediction, version)
+            for p, prediction in zip(patients, predictions)
+        ]
         
-        return [await format_patient_response(p, db) for p in patients]
-        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching patients: {str(e)}")
 
+def project_patient(patient, fields, prediction=None, version=None):
+    """Response dict with only `fields` (plus prediction when one was made)"""
+    item = {field: getattr(patient, RESPONSE_COLUMNS[field]) for field in fields}
+    if prediction is not None:
+        item["prediction"] = prediction
+        item["health_status"] = health_status(prediction)
+        item["model_version"] = version
+    return item
+
+@app.get("/patients/export")
+async def export_patients(
+    format: str = "ndjson",
+    include_prediction: bool = True,
+    chunk_size: int = export.EXPORT_CHUNK_SIZE,
+):
+    """
+    Stream every patient (with predictions) as NDJSON, CSV or Arrow IPC.
+    Reads through a server-side cursor and scores fixed-size chunks, so
+    memory stays constant regardless of table size.
+    """
+    if format not in export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(export.EXPORT_FORMATS)}")
+    if format == "arrow" and export.pa is None:
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow to be installed")
+
+    headers = {}
+    predict = None
+    if include_prediction:
+        # The whole export is scored by the model current when it started
+        handle = await current_model()
+        predict = batcher_predict_from_thread(handle, asyncio.get_running_loop())
+        headers["X-Model-Version"] = handle.version
+    body = export.export_patients(
+        engine, format,
+        chunk_size=max(1, min(chunk_size, export.MAX_EXPORT_CHUNK_SIZE)),
+        predict=predict,
+    )
+    extension = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}[format]
+    return StreamingResponse(
+        body,
+        media_type=export.EXPORT_FORMATS[format],
+        headers={**headers, "Content-Disposition": f'attachment; filename="patients.{extension}"'},
+    )
+
 @app.get("/patients/{patient_id}", response_model=Patient)
-async def get_patient(patient_id: int, db: Session = Depends(get_mysql_db)):
+async def get_patient(patient_id: int, db: AsyncDBSession = Depends(get_async_mysql_db)):
     try:
-        result = db.execute(
-            text("SELECT * FROM patients WHERE patient_id = :patient_id"),
+        result = await db.execute(
+            text(SELECT_PATIENT_BY_ID),
             {"patient_id": patient_id}
         )
         patient = result.fetchone()
@@ -139,30 +463,59 @@ async def get_patient(patient_id: int, db: Session = Depends(get_mysql_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error fetching patient: {str(e)}")
 
+async def predict_patients(patients, handle):
+    """Predictions for `patients` rows from the `handle` model, scoring only the ones not cached"""
+    keys = [cache_key(p, handle.cache_version) for p in patients]
+    predictions = await prediction_cache.get_many(keys)
+
+    missing = [(p, key) for p, key in zip(patients, keys) if key not in predictions]
+    if missing:
+        # One predict call for every uncached row instead of one per row; small
+        # requests share a micro-batch with concurrent ones
+        X = build_feature_matrix([p for p, _ in missing])
+        scored = classify(await inference_batcher.predict_rows(handle, X)).tolist()
+        fresh = {key: prediction for (_, key), prediction in zip(missing, scored)}
+        await prediction_cache.put_many(fresh)
+        predictions.update(fresh)
+
+    return [predictions[key] for key in keys]
+
+def batcher_predict(handle):
+    """async predict(X) -> classes scored by the inference batcher with `handle`'s model"""
+    async def predict(X):
+        return classify(await inference_batcher.predict_rows(handle, X)).tolist()
+    return predict
+
+def batcher_predict_from_thread(handle, loop):
+    """
+    predict(X) -> classes for synchronous code on Starlette's thread pool
+    (streamed response bodies): each call is handed back to `loop` and
+    scored by the inference batcher, so the model never runs concurrently
+    in the API process (and runs in a worker process with
+    INFERENCE_BACKEND=process).
+    """
+    def predict(X):
+        scoring = asyncio.run_coroutine_threadsafe(inference_batcher.predict_rows(handle, X), loop)
+        return classify(scoring.result()).tolist()
+    return predict
+
 async def format_patient_response(patient, db):
     """Helper function to format patient response with prediction"""
-    # Prepare features for prediction
-    features = [
-        patient.patient_age,
-        1 if patient.gender.lower() == "male" else 0,
-        ["typical angina", "atypical angina", "non-anginal", "asymptomatic"].index(patient.chest_pain_type),
-        patient.resting_blood_pressure,
-        patient.cholesterol_level,
-        1 if str(patient.fasting_blood_sugar).upper() == "TRUE" else 0,
-        ["normal", "st-t abnormality", "lv hypertrophy"].index(patient.resting_ecg_results),
-        patient.max_heart_rate,
-        1 if str(patient.exercise_induced_angina).upper() == "TRUE" else 0,
-        patient.st_depression,
-        ["upsloping", "flat", "downsloping"].index(patient.exercise_peak_slope),
-        patient.major_vessels_count,
-        ["normal", "fixed defect", "reversable defect"].index(patient.thalassemia_type),
-    ]
-
-    # Get prediction
-    input_data = np.array([features])
-    prediction = int(model.predict(input_data)[0])
-    health_status = "Healthy ✅" if prediction == 0 else "At Risk (Heart Disease) ⚠️"
-
+    handle = await current_model()
+    prediction = (await predict_patients([patient], handle))[0]
+    await prediction_log.alog({
+        "patient_id": patient.patient_id,
+        "prediction": int(prediction),
+        "risk_level": health_status(prediction),
+        "model_version": handle.version,
+        "record_updated_at": patient.record_updated_at,
+        "timestamp": datetime.now(),
+        "source": "api",
+    })
+    return build_patient_response(patient, prediction, handle.version)
+
+def build_patient_response(patient, prediction, version=None):
+    """Build the Patient response for a row whose prediction is already known"""
     return Patient(
         id=patient.patient_id,
         age=patient.patient_age,
@@ -182,102 +535,85 @@ async def format_patient_response(patient, db):
         num=patient.heart_disease_diagnosis,
         created_at=patient.record_created_at,
         prediction=prediction,
-        health_status=health_status
+        health_status=health_status(prediction),
+        model_version=version,
     )
 
 @app.put("/patients/{patient_id}", response_model=Patient)
 async def update_patient(
     patient_id: int,
     patient_update: PatientUpdate,
-    db: Session = Depends(get_mysql_db),
+    db: AsyncDBSession = Depends(get_async_mysql_db),
 ):
-    existing = db.execute(
-        text("SELECT * FROM patients WHERE patient_id = :patient_id"),
+    existing = (await db.execute(
+        text(SELECT_PATIENT_BY_ID),
         {"patient_id": patient_id},
-    ).fetchone()
+    )).fetchone()
 
     if not existing:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    field_mapping = {
-        "age": "patient_age",
-        "sex": "gender",
-        "dataset": "data_source",
-        "cp": "chest_pain_type",
-        "trestbps": "resting_blood_pressure",
-        "chol": "cholesterol_level",
-        "fbs": "fasting_blood_sugar",
-        "restecg": "resting_ecg_results",
-        "thalch": "max_heart_rate",
-        "exang": "exercise_induced_angina",
-        "oldpeak": "st_depression",
-        "slope": "exercise_peak_slope",
-        "ca": "major_vessels_count",
-        "thal": "thalassemia_type",
-        "num": "heart_disease_diagnosis",
-    }
-
     update_fields = []
     update_values = {"patient_id": patient_id}
 
     for api_field, value in patient_update.dict(exclude_unset=True).items():
-        if api_field in field_mapping:
-            db_col = field_mapping[api_field]
+        if api_field in PATIENT_COLUMNS:
+            db_col = PATIENT_COLUMNS[api_field]
             update_fields.append(f"{db_col} = :{api_field}")
             update_values[api_field] = value
 
     if not update_fields:
         return await get_patient(patient_id, db)
 
-    query = text(
-        f"UPDATE patients SET {', '.join(update_fields)} "
-        "WHERE patient_id = :patient_id"
-    )
+    query = text(UPDATE_PATIENT.format(assignments=", ".join(update_fields)))
     try:
-        db.execute(query, update_values)
-        db.commit()
+        await db.execute(query, update_values)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error updating patient: {e}")
 
+    await prediction_cache.invalidate(patient_id)
+
     return await get_patient(patient_id, db)
 
 @app.delete("/patients/{patient_id}")
-async def delete_patient(patient_id: int, db: Session = Depends(get_mysql_db)):
+async def delete_patient(patient_id: int, db: AsyncDBSession = Depends(get_async_mysql_db)):
     try:
-        existing = db.execute(
-            text("SELECT * FROM patients WHERE patient_id = :patient_id"),
+        existing = (await db.execute(
+            text(SELECT_PATIENT_BY_ID),
             {"patient_id": patient_id}
-        ).fetchone()
+        )).fetchone()
         
         if not existing:
             raise HTTPException(status_code=404, detail="Patient not found")
 
         # Delete dependent logs first (MySQL foreign keys)
-        db.execute(
-            text("DELETE FROM patient_logs WHERE patient_id = :patient_id"),
+        await db.execute(
+            text(DELETE_PATIENT_LOGS),
             {"patient_id": patient_id}
         )
 
-        db.execute(
-            text("DELETE FROM patients WHERE patient_id = :patient_id"),
+        await db.execute(
+            text(DELETE_PATIENT),
             {"patient_id": patient_id}
         )
-        db.commit()
+        await db.commit()
+        await prediction_cache.invalidate(patient_id)
 
         return {"message": f"Patient {patient_id} and related logs deleted successfully"}
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Error deleting patient: {str(e)}")
 
 @app.get("/patients/latest/data")
-async def get_latest_patient_data(db: Session = Depends(get_mysql_db)):
+async def get_latest_patient_data(db: AsyncDBSession = Depends(get_async_mysql_db)):
     try:
-        result = db.execute(
-            text("SELECT * FROM patients ORDER BY record_created_at DESC LIMIT 1")
+        result = await db.execute(
+            text(SELECT_LATEST_PATIENT)
         )
         patient = result.fetchone()
         
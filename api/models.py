@@ -1,7 +1,26 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
+# API field name -> column of the `patients` table
+PATIENT_COLUMNS = {
+    "age": "patient_age",
+    "sex": "gender",
+    "dataset": "data_source",
+    "cp": "chest_pain_type",
+    "trestbps": "resting_blood_pressure",
+    "chol": "cholesterol_level",
+    "fbs": "fasting_blood_sugar",
+    "restecg": "resting_ecg_results",
+    "thalch": "max_heart_rate",
+    "exang": "exercise_induced_angina",
+    "oldpeak": "st_depression",
+    "slope": "exercise_peak_slope",
+    "ca": "major_vessels_count",
+    "thal": "thalassemia_type",
+    "num": "heart_disease_diagnosis",
+}
+
 # Pydantic models for request/response validation
 
 class PatientBase(BaseModel):
@@ -48,11 +67,38 @@ class Patient(PatientBase):
     class Config:
         orm_mode = True
 
-# If you have PredictionRequest and PredictionResponse, define them similarly
+# Prediction on raw feature records (POST /predict, POST /predict/batch);
+# missing features are imputed the same way as rows read from MySQL
 class PredictionRequest(BaseModel):
-    # define the input features for prediction here
-    pass
+    age: Optional[float] = None
+    sex: Optional[str] = None
+    cp: Optional[str] = None
+    trestbps: Optional[float] = None
+    chol: Optional[float] = None
+    fbs: Optional[Union[bool, str]] = None
+    restecg: Optional[str] = None
+    thalch: Optional[float] = None
+    exang: Optional[Union[bool, str]] = None
+    oldpeak: Optional[float] = None
+    slope: Optional[str] = None
+    ca: Optional[float] = None
+    thal: Optional[str] = None
 
 class PredictionResponse(BaseModel):
-    # define prediction result fields here
-    pass
+    prediction: int
+    probability: float
+    health_status: str
+    model_version: str
+
+    class Config:
+        protected_namespaces = ()
+
+class BatchPredictionResponse(BaseModel):
+    """Column-oriented results, in request row order"""
+    count: int
+    predictions: List[int]
+    probabilities: List[float]
+    model_version: str
+
+    class Config:
+        protected_namespaces = ()
@@ -0,0 +1,332 @@
+"""
+api/mongo_sync.py
+Incremental (change-data-capture style) MySQL -> Mongo sync of `patients`.
+
+Three high-water marks are kept in the Mongo `sync_state` collection:
+
+* (record_updated_at, patient_id) - rows inserted or updated since the last
+  run are read in keyset order through idx_patients_updated_at. Each run
+  re-reads a small overlap window before the mark, because TIMESTAMP has
+  one-second resolution and a row committed later within the same second
+  could sort before the mark.
+* patient_logs.log_id - patients with new audit rows are re-read as well,
+  which also catches loads that set record_updated_at explicitly.
+* patient_deletions.deletion_id - tombstones written by the
+  after_patient_delete trigger (migrations/003_patient_deletions.sql).
+  Deleted ids that are still absent from MySQL are deleted from Mongo.
+
+Lag is the age of the oldest change not yet synced, measured before each
+pass (0 when nothing is pending).
+
+Changed rows are applied in batches with unordered bulk_write upserts keyed
+on patient_id, so rerunning a sync (or overlapping windows) is idempotent.
+
+migrate_all is the initial full copy: a server-side cursor streams fixed
+size batches to a small pool of writer threads, with a bounded number of
+batches in flight so memory stays flat, and leaves high-water marks behind
+so the incremental sync picks up from where the copy started.
+"""
+
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import OperationFailure
+from sqlalchemy import bindparam, text
+
+from api.models import PATIENT_COLUMNS
+from api.queries import SELECT_ALL_PATIENTS
+
+MIGRATE_WRITERS = 4
+SYNC_BATCH_SIZE = 1000
+SYNC_INTERVAL_SECONDS = 5.0
+SYNC_OVERLAP_SECONDS = 2
+SYNC_STATE_ID = "mysql_patients"
+
+_EPOCH = datetime(1970, 1, 1)
+
+CHANGED_PATIENTS = """
+    SELECT * FROM patients
+    WHERE record_updated_at > :after_ts
+       OR (record_updated_at = :after_ts AND patient_id > :after_id)
+    ORDER BY record_updated_at, patient_id
+    LIMIT :limit
+"""
+LOGGED_PATIENT_IDS = """
+    SELECT log_id, patient_id FROM patient_logs
+    WHERE log_id > :after_log_id
+    ORDER BY log_id
+    LIMIT :limit
+"""
+DELETED_PATIENT_IDS = """
+    SELECT deletion_id, patient_id FROM patient_deletions
+    WHERE deletion_id > :after_deletion_id
+    ORDER BY deletion_id
+    LIMIT :limit
+"""
+OLDEST_UNSYNCED_CHANGE = """
+    SELECT CURRENT_TIMESTAMP AS now,
+        (SELECT MIN(record_updated_at) FROM patients
+         WHERE record_updated_at > :after_ts
+            OR (record_updated_at = :after_ts AND patient_id > :after_id)) AS oldest_update,
+        (SELECT MIN(deleted_at) FROM patient_deletions
+         WHERE deletion_id > :after_deletion_id) AS oldest_deletion
+"""
+PATIENTS_BY_IDS = text("SELECT * FROM patients WHERE patient_id IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+EXISTING_PATIENT_IDS = text("SELECT patient_id FROM patients WHERE patient_id IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+MAX_DELETION_ID = "SELECT COALESCE(MAX(deletion_id), 0) FROM patient_deletions"
+
+
+def patient_document(row):
+    """Mongo document for a `patients` row (API field names)"""
+    doc = {"patient_id": row.patient_id}
+    doc.update({field: getattr(row, column) for field, column in PATIENT_COLUMNS.items()})
+    doc["created_at"] = row.record_created_at.isoformat() if row.record_created_at else None
+    doc["updated_at"] = row.record_updated_at.isoformat() if row.record_updated_at else None
+    return doc
+
+
+def ensure_indexes(collection):
+    """Unique patient_id index the upserts rely on; warns if old duplicates block it"""
+    try:
+        collection.create_index("patient_id", unique=True)
+    except OperationFailure as e:
+        print(f"⚠️  Could not create unique patient_id index (duplicate documents?): {e}")
+
+
+def upsert_documents(collection, rows):
+    """Unordered bulk upsert of `rows` keyed on patient_id; returns the write count"""
+    if not rows:
+        return 0
+    requests = [ReplaceOne({"patient_id": row.patient_id}, patient_document(row), upsert=True) for row in rows]
+    result = collection.bulk_write(requests, ordered=False)
+    return result.upserted_count + result.modified_count
+
+
+def insert_documents(collection, rows):
+    """Unordered insert_many for an empty target collection; returns the insert count"""
+    if not rows:
+        return 0
+    return len(collection.insert_many([patient_document(row) for row in rows], ordered=False).inserted_ids)
+
+
+def save_high_water_mark(state_collection, updated_at, patient_id=0, log_id=0, deletion_id=0):
+    state_collection.update_one(
+        {"_id": SYNC_STATE_ID},
+        {"$set": {"updated_at": updated_at, "patient_id": patient_id, "log_id": log_id,
+                  "deletion_id": deletion_id}},
+        upsert=True,
+    )
+
+
+def migrate_all(engine, collection, state_collection=None, batch_size=SYNC_BATCH_SIZE,
+                writers=MIGRATE_WRITERS, upsert=True):
+    """
+    Stream every patient into `collection`.
+
+    `writers` threads apply batches concurrently (unordered upserts, or
+    insert_many with upsert=False for a known-empty collection); at most
+    2 * writers batches are buffered. With `state_collection`, the
+    incremental sync marks are set to the moment the copy started.
+    Returns {"rows", "written", "seconds", "rows_per_sec"}.
+    """
+    write = upsert_documents if upsert else insert_documents
+    in_flight = threading.BoundedSemaphore(2 * writers)
+    stats = {"rows": 0, "written": 0}
+    lock = threading.Lock()
+    errors = []
+
+    def write_batch(rows):
+        try:
+            written = write(collection, rows)
+            with lock:
+                stats["written"] += written
+        except Exception as e:
+            errors.append(e)
+        finally:
+            in_flight.release()
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        started_at = conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()
+        max_log_id = conn.execute(text("SELECT COALESCE(MAX(log_id), 0) FROM patient_logs")).scalar()
+        max_deletion_id = conn.execute(text(MAX_DELETION_ID)).scalar()
+
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+            text(SELECT_ALL_PATIENTS)
+        )
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            for rows in result.partitions(batch_size):
+                if errors:
+                    break
+                in_flight.acquire()
+                pool.submit(write_batch, rows)
+                stats["rows"] += len(rows)
+                elapsed = time.perf_counter() - start
+                print(f"✅  {stats['rows']:,} rows read, {stats['written']:,} written "
+                      f"({stats['rows'] / elapsed:,.0f} rows/sec)")
+
+    if errors:
+        raise RuntimeError(f"{len(errors)} Mongo batches failed: {errors[0]}")
+    if state_collection is not None:
+        # Rows changed while copying have record_updated_at >= started_at
+        save_high_water_mark(state_collection, started_at, log_id=max_log_id, deletion_id=max_deletion_id)
+
+    elapsed = time.perf_counter() - start
+    return {**stats, "seconds": elapsed, "rows_per_sec": stats["rows"] / elapsed if elapsed else 0.0}
+
+
+class PatientSync:
+    """
+    Incremental sync from `engine` (MySQL) into `collection` (Mongo). State
+    lives in `state_collection`; metrics() reports progress and lag.
+    """
+
+    def __init__(self, engine, collection, state_collection, batch_size=SYNC_BATCH_SIZE,
+                 overlap_seconds=SYNC_OVERLAP_SECONDS):
+        self.engine = engine
+        self.collection = collection
+        self.state_collection = state_collection
+        self.batch_size = batch_size
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.state = self._load_state()
+        self.stats = {"polls": 0, "upserted": 0, "deleted": 0, "errors": 0,
+                      "last_poll_at": None, "last_poll_s": 0.0, "lag_s": None}
+
+    def _load_state(self):
+        state = self.state_collection.find_one({"_id": SYNC_STATE_ID}) or {}
+        return {
+            "updated_at": state.get("updated_at", _EPOCH),
+            "patient_id": state.get("patient_id", 0),
+            "log_id": state.get("log_id", 0),
+            "deletion_id": state.get("deletion_id", 0),
+        }
+
+    def _save_state(self):
+        self.state_collection.replace_one(
+            {"_id": SYNC_STATE_ID},
+            {**self.state, "metrics": self.metrics()},
+            upsert=True,
+        )
+
+    def _sync_updated(self, conn):
+        """Keyset-walk rows changed since the updated_at mark (minus the overlap window)"""
+        after_ts = max(self.state["updated_at"] - self.overlap, _EPOCH)
+        after_id = 0
+        written = 0
+        while True:
+            rows = conn.execute(text(CHANGED_PATIENTS),
+                                {"after_ts": after_ts, "after_id": after_id, "limit": self.batch_size}).fetchall()
+            if not rows:
+                return written
+            written += upsert_documents(self.collection, rows)
+            last = rows[-1]
+            after_ts, after_id = last.record_updated_at, last.patient_id
+            if (after_ts, after_id) > (self.state["updated_at"], self.state["patient_id"]):
+                self.state["updated_at"], self.state["patient_id"] = after_ts, after_id
+            self._save_state()
+
+    def _sync_logged(self, conn):
+        """Re-read patients with new patient_logs rows"""
+        written = 0
+        while True:
+            logs = conn.execute(text(LOGGED_PATIENT_IDS),
+                                {"after_log_id": self.state["log_id"], "limit": self.batch_size}).fetchall()
+            if not logs:
+                return written
+            ids = sorted({log.patient_id for log in logs if log.patient_id is not None})
+            rows = conn.execute(PATIENTS_BY_IDS, {"ids": ids}).fetchall() if ids else []
+            written += upsert_documents(self.collection, rows)
+            self.state["log_id"] = logs[-1].log_id
+            self._save_state()
+
+    def _sync_deleted(self, conn):
+        """Delete patients with new patient_deletions tombstones, unless the id exists again"""
+        deleted = 0
+        while True:
+            tombstones = conn.execute(text(DELETED_PATIENT_IDS),
+                                      {"after_deletion_id": self.state["deletion_id"],
+                                       "limit": self.batch_size}).fetchall()
+            if not tombstones:
+                return deleted
+            ids = sorted({tombstone.patient_id for tombstone in tombstones})
+            existing = set(conn.execute(EXISTING_PATIENT_IDS, {"ids": ids}).scalars())
+            missing = [pid for pid in ids if pid not in existing]
+            if missing:
+                result = self.collection.bulk_write([DeleteOne({"patient_id": pid}) for pid in missing],
+                                                    ordered=False)
+                deleted += result.deleted_count
+            self.state["deletion_id"] = tombstones[-1].deletion_id
+            self._save_state()
+
+    def _lag_seconds(self, conn):
+        """Age of the oldest insert/update/delete not yet synced; 0 when caught up"""
+        row = conn.execute(text(OLDEST_UNSYNCED_CHANGE), {
+            "after_ts": self.state["updated_at"],
+            "after_id": self.state["patient_id"],
+            "after_deletion_id": self.state["deletion_id"],
+        }).one()
+        pending = [ts for ts in (row.oldest_update, row.oldest_deletion) if ts is not None]
+        if not pending:
+            return 0.0
+        return max((row.now - min(pending)).total_seconds(), 0.0)
+
+    def run_once(self):
+        """One incremental pass; returns the stats snapshot"""
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            first_run = self.state["updated_at"] == _EPOCH and not self.state["log_id"]
+            if first_run:
+                # The updated_at pass reads the whole table; skip replaying old
+                # audit rows and tombstones of rows it will never see
+                max_log_id = conn.execute(text("SELECT COALESCE(MAX(log_id), 0) FROM patient_logs")).scalar()
+                max_deletion_id = conn.execute(text(MAX_DELETION_ID)).scalar()
+            # How far behind MySQL the collection was when this pass started
+            self.stats["lag_s"] = self._lag_seconds(conn)
+            upserted = self._sync_updated(conn)
+            if first_run:
+                self.state["log_id"] = max_log_id
+                self.state["deletion_id"] = max_deletion_id
+            logged = self._sync_logged(conn)
+            deleted = self._sync_deleted(conn)
+        self.stats["polls"] += 1
+        self.stats["upserted"] += upserted + logged
+        self.stats["deleted"] += deleted
+        self.stats["last_poll_at"] = datetime.now(timezone.utc).isoformat()
+        self.stats["last_poll_s"] = time.perf_counter() - start
+        self._save_state()
+        return self.metrics()
+
+    def metrics(self):
+        return {**self.stats, "high_water_mark": {
+            "updated_at": self.state["updated_at"].isoformat(),
+            "patient_id": self.state["patient_id"],
+            "log_id": self.state["log_id"],
+            "deletion_id": self.state["deletion_id"],
+        }}
+
+    def run_forever(self, interval=SYNC_INTERVAL_SECONDS):
+        """Poll every `interval` seconds until SIGINT/SIGTERM"""
+        stopping = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stopping.append(True))
+
+        while not stopping:
+            try:
+                m = self.run_once()
+                print(f"🔄 poll {m['polls']}: {m['upserted']:,} upserted, {m['deleted']:,} deleted, "
+                      f"lag {m['lag_s']:.1f}s, {m['last_poll_s'] * 1000:.0f} ms")
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️  Sync poll failed: {e}")
+            deadline = time.monotonic() + interval
+            while not stopping and time.monotonic() < deadline:
+                time.sleep(0.2)
+        print("👋 Sync daemon stopped")
@@ -0,0 +1,154 @@
+"""
+api/native_model.py
+Pure-NumPy inference for the heart disease network.
+
+The trained Keras Sequential model (Dense -> BatchNormalization -> Dropout
+-> Dense ... -> sigmoid) is exported once to an uncompressed .npz holding
+one flat float32 array per weight plus a JSON layer spec. Loading it needs
+neither TensorFlow nor Keras: the arrays are memory-mapped straight out of
+the archive, so a cold start is a file open and every worker process that
+maps the same file shares its pages.
+
+Inference runs the same float32 computations as Keras, with
+BatchNormalization folded into a per-feature scale and shift (moving
+statistics, inference mode) and Dropout skipped. scripts/export_native_model.py
+writes the file and checks its outputs against the pickle.
+
+Serve it with MODEL_PATH=models/heart_disease_model.npz.
+"""
+
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+NATIVE_MODEL_SUFFIX = ".npz"
+NATIVE_FORMAT = 1
+
+
+def _sigmoid(x):
+    with np.errstate(over="ignore"):  # exp overflow -> output 0, as in Keras
+        return 1 / (1 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+class NativeModel:
+    """Sequential dense network evaluated with NumPy; predict() mirrors keras Model.predict"""
+
+    def __init__(self, layers):
+        self.layers = layers  # [{"type": "dense"|"affine", ...arrays}]
+
+    def predict(self, X, *args, **kwargs):
+        out = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            if layer["type"] == "dense":
+                out = out @ layer["kernel"]
+                if "bias" in layer:
+                    out += layer["bias"]
+                out = ACTIVATIONS[layer["activation"]](out)
+            else:  # folded BatchNormalization
+                out = out * layer["scale"] + layer["shift"]
+        return out
+
+
+def keras_layers(model):
+    """[(spec, {name: array})] for the layers of a trained Keras Sequential model"""
+    exported = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+        weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+
+        if kind in ("InputLayer", "Dropout"):
+            continue  # nothing to do at inference time
+        if kind == "Dense":
+            if config["activation"] not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation {config['activation']!r} in layer {layer.name}")
+            arrays = {"kernel": weights[0]}
+            if config.get("use_bias", True):
+                arrays["bias"] = weights[1]
+            exported.append(({"type": "dense", "activation": config["activation"]}, arrays))
+        elif kind == "BatchNormalization":
+            if config.get("axis", -1) not in (-1, [-1], 1, [1]):
+                raise ValueError(f"BatchNormalization over axis {config['axis']} is not supported")
+            it = iter(weights)
+            gamma = next(it) if config.get("scale", True) else np.float32(1)
+            beta = next(it) if config.get("center", True) else np.float32(0)
+            moving_mean, moving_variance = next(it), next(it)
+            scale = (gamma / np.sqrt(moving_variance + np.float32(config["epsilon"]))).astype(np.float32)
+            shift = (beta - moving_mean * scale).astype(np.float32)
+            exported.append(({"type": "affine"}, {"scale": scale, "shift": shift}))
+        else:
+            raise ValueError(f"Layer {layer.name} ({kind}) has no NumPy equivalent")
+    return exported
+
+
+def save_native_model(layers, path):
+    """Write [(spec, arrays)] as an uncompressed (memory-mappable) .npz"""
+    specs, arrays = [], {}
+    for i, (spec, layer_arrays) in enumerate(layers):
+        specs.append({**spec, "arrays": sorted(layer_arrays)})
+        arrays.update({f"layer{i}_{name}": array for name, array in layer_arrays.items()})
+    spec = json.dumps({"format": NATIVE_FORMAT, "layers": specs})
+    np.savez(path, spec=np.array(spec), **arrays)
+
+
+def export_keras_model(model, path):
+    save_native_model(keras_layers(model), path)
+
+
+def _mmap_npz(path):
+    """{name: read-only memmap} for an uncompressed .npz; None if any member is compressed"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            shape, fortran_order, dtype = _HEADER_READERS[version](f)
+            name = info.filename[:-len(".npy")]
+            if dtype.kind in "OU":  # the spec string is read normally
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran_order else "C").view(np.ndarray)
+    return arrays
+
+
+def load_native_model(path, mmap=True):
+    """NativeModel from an exported .npz (weights memory-mapped unless mmap=False)"""
+    with np.load(path, allow_pickle=False) as archive:
+        spec = json.loads(str(archive["spec"]))
+        arrays = (_mmap_npz(path) if mmap else None) or {
+            name: archive[name] for name in archive.files if name != "spec"
+        }
+    if spec.get("format") != NATIVE_FORMAT:
+        raise ValueError(f"{path} is not a native model export (format {spec.get('format')})")
+
+    layers = []
+    for i, layer_spec in enumerate(spec["layers"]):
+        layer = {key: value for key, value in layer_spec.items() if key != "arrays"}
+        layer.update({name: arrays[f"layer{i}_{name}"] for name in layer_spec["arrays"]})
+        layers.append(layer)
+    return NativeModel(layers)
@@ -0,0 +1,78 @@
+"""
+api/pagination.py
+Keyset (cursor) pagination for the patients table.
+
+A cursor is an opaque url-safe token holding the sort key of the last row
+of a page. The next page seeks straight to it through the index
+(`WHERE patient_id > :after_id`) instead of scanning and discarding
+`OFFSET` rows, so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+# sort name -> ordered key columns (patient_id always breaks ties)
+SORT_KEYS = {
+    "id": ["patient_id"],
+    "created_at": ["record_created_at", "patient_id"],
+}
+
+
+def encode_cursor(sort, row):
+    """Opaque cursor pointing just after `row` for the given sort"""
+    values = [getattr(row, column) for column in SORT_KEYS[sort]]
+    payload = {"s": sort, "v": [v.isoformat() if isinstance(v, datetime) else v for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (sort, values) from a cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        sort, values = payload["s"], payload["v"]
+        if not isinstance(sort, str) or sort not in SORT_KEYS:
+            raise ValueError("unknown sort")
+        if not isinstance(values, list) or len(values) != len(SORT_KEYS[sort]):
+            raise ValueError("wrong number of key values")
+        # patient_id always comes last and is an integer (bool is not)
+        if not isinstance(values[-1], int) or isinstance(values[-1], bool):
+            raise ValueError("patient_id must be an integer")
+        if sort == "created_at":
+            values[0] = datetime.fromisoformat(values[0])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return sort, values
+
+
+def page_query(sort="id", after=None, conditions=(), columns="*", table="patients"):
+    """
+    Build (sql, params) for one page ordered by `sort`.
+
+    With `after` (values from decode_cursor) the page seeks past that key;
+    without it the query falls back to LIMIT/OFFSET (bind :skip). Extra
+    `conditions` are ANDed in; the caller binds their params and :limit.
+    """
+    where = [f"({condition})" for condition in conditions]
+    params = {}
+
+    if after is not None:
+        if sort == "id":
+            where.append("patient_id > :after_id")
+            params["after_id"] = after[0]
+        else:
+            where.append(
+                "(record_created_at > :after_ts"
+                " OR (record_created_at = :after_ts AND patient_id > :after_id))"
+            )
+            params["after_ts"], params["after_id"] = after
+
+    sql = f"SELECT {columns} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(SORT_KEYS[sort]) + " LIMIT :limit"
+    if after is None:
+        sql += " OFFSET :skip"
+    return sql, params
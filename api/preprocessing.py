@@ -0,0 +1,123 @@
+"""
+api/preprocessing.py
+Training-time preprocessing artifact for the heart disease model.
+
+The artifact is a small JSON file next to the model that holds the
+standard-scaler statistics (per-feature mean and scale) fitted on the
+training data, together with the category maps, fallback codes and numeric
+defaults the encoder used. It is loaded once; transform() is a precomputed
+affine map (X * factor + offset) on the encoded (n, 13) matrix, so a batch
+of any size is scaled in one vectorized NumPy operation.
+
+Without an artifact the transform is the identity, which is what the API
+has always fed the pickled model. An artifact whose category maps differ
+from api/features.py is refused, because its statistics would describe
+differently encoded columns.
+
+Build one from the training CSV with scripts/build_preprocessor.py.
+
+Optional .env settings:
+
+PREPROCESSOR_PATH=models/heart_disease_model.preprocessing.json
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from api.features import CATEGORIES, FALLBACK_CODES, FEATURE_COLUMNS, NUMERIC_DEFAULTS
+
+PREPROCESSOR_PATH = os.getenv(
+    "PREPROCESSOR_PATH", os.path.join("models", "heart_disease_model.preprocessing.json")
+)
+ARTIFACT_FORMAT = 1
+
+
+class Preprocessor:
+    """Standard scaling of encoded feature matrices with fixed training statistics"""
+
+    def __init__(self, mean, scale):
+        self.mean = np.asarray(mean, dtype=np.float64).reshape(len(FEATURE_COLUMNS))
+        self.scale = np.asarray(scale, dtype=np.float64).reshape(len(FEATURE_COLUMNS))
+        # (X - mean) / scale == X * factor + offset
+        self.factor = 1.0 / self.scale
+        self.offset = -self.mean * self.factor
+        self.identity = not self.mean.any() and bool((self.scale == 1.0).all())
+
+    @classmethod
+    def fit(cls, X):
+        """Statistics of an encoded training matrix (zero-variance columns keep scale 1, like StandardScaler)"""
+        X = np.asarray(X, dtype=np.float64)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        return cls(X.mean(axis=0), scale)
+
+    @classmethod
+    def identity_transform(cls):
+        return cls(np.zeros(len(FEATURE_COLUMNS)), np.ones(len(FEATURE_COLUMNS)))
+
+    def transform(self, X):
+        """Scaled copy of an encoded (n, 13) matrix; the identity returns X itself"""
+        if self.identity:
+            return X
+        return np.asarray(X, dtype=np.float64) * self.factor + self.offset
+
+    def to_dict(self):
+        return {
+            "format": ARTIFACT_FORMAT,
+            "features": FEATURE_COLUMNS,
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "categories": CATEGORIES,
+            "fallback_codes": FALLBACK_CODES,
+            "numeric_defaults": NUMERIC_DEFAULTS,
+        }
+
+    @property
+    def version(self):
+        """First 12 hex chars of the sha256 of the artifact's canonical JSON"""
+        canonical = json.dumps(self.to_dict(), sort_keys=True).encode()
+        return hashlib.sha256(canonical).hexdigest()[:12]
+
+    def save(self, path=PREPROCESSOR_PATH):
+        """Atomically write the artifact"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def info(self):
+        return {"version": self.version, "identity": self.identity}
+
+
+def load_preprocessor(path=PREPROCESSOR_PATH):
+    """The artifact at `path`, or the identity transform if there is none"""
+    if not os.path.exists(path):
+        return Preprocessor.identity_transform()
+    with open(path) as f:
+        artifact = json.load(f)
+
+    if artifact.get("format") != ARTIFACT_FORMAT or artifact.get("features") != FEATURE_COLUMNS:
+        raise ValueError(f"{path} is not a preprocessing artifact for this feature set")
+    encoder = {
+        "categories": CATEGORIES,
+        "fallback_codes": FALLBACK_CODES,
+        "numeric_defaults": NUMERIC_DEFAULTS,
+    }
+    for key, current in encoder.items():
+        if artifact.get(key) != current:
+            raise ValueError(f"{path} was built with different {key.replace('_', ' ')} than api/features.py")
+    return Preprocessor(artifact["mean"], artifact["scale"])
+
+
+class PreprocessedModel:
+    """A model whose predict() scales encoded features with the training-time statistics first"""
+
+    def __init__(self, model, preprocessor):
+        self.model = model
+        self.preprocessor = preprocessor
+
+    def predict(self, X, *args, **kwargs):
+        return self.model.predict(self.preprocessor.transform(X), *args, **kwargs)
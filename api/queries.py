@@ -0,0 +1,73 @@
+"""
+api/queries.py
+SQL run by the API endpoints against the `patients` table.
+
+Kept in one place so scripts/check_query_plans.py can EXPLAIN exactly the
+statements the handlers execute.
+"""
+
+from api.features import DB_COLUMNS as FEATURE_DB_COLUMNS
+from api.models import PATIENT_COLUMNS
+from api.pagination import SORT_KEYS, page_query
+
+# Response columns for GET /patients/ (`fields=` projection), API name -> DB column
+RESPONSE_COLUMNS = {"id": "patient_id", **PATIENT_COLUMNS, "created_at": "record_created_at"}
+
+# Columns needed to score a row (features, which also make the cache key, + log fields)
+PREDICTION_COLUMNS = list(FEATURE_DB_COLUMNS.values()) + ["patient_id", "record_updated_at"]
+
+SELECT_PATIENT_BY_ID = "SELECT * FROM patients WHERE patient_id = :patient_id"
+
+# Served by idx_patients_created_at (backward index scan, no sort)
+SELECT_LATEST_PATIENT = "SELECT * FROM patients ORDER BY record_created_at DESC LIMIT 1"
+
+# Full clustered-index read for GET /patients/export (streamed, never
+# materialized); intentionally not part of scripts/check_query_plans.py
+SELECT_ALL_PATIENTS = "SELECT * FROM patients ORDER BY patient_id"
+
+UPDATE_PATIENT = "UPDATE patients SET {assignments} WHERE patient_id = :patient_id"
+
+DELETE_PATIENT_LOGS = "DELETE FROM patient_logs WHERE patient_id = :patient_id"
+
+DELETE_PATIENT = "DELETE FROM patients WHERE patient_id = :patient_id"
+
+
+def patient_filters(dataset=None, min_age=None, max_age=None, cp=None, num=None,
+                    created_after=None, created_before=None):
+    """
+    Compile GET /patients/ filters into (conditions, params). Every condition
+    is a plain comparison on a bare indexed column, so MySQL can seek on it.
+    """
+    candidates = [
+        ("data_source = :dataset", "dataset", dataset),
+        ("patient_age >= :min_age", "min_age", min_age),
+        ("patient_age <= :max_age", "max_age", max_age),
+        ("chest_pain_type = :cp", "cp", cp),
+        ("heart_disease_diagnosis = :num", "num", num),
+        ("record_created_at >= :created_after", "created_after", created_after),
+        ("record_created_at < :created_before", "created_before", created_before),
+    ]
+
+    conditions, params = [], {}
+    for condition, name, value in candidates:
+        if value is not None:
+            conditions.append(condition)
+            params[name] = value
+    return conditions, params
+
+
+def list_patients_query(sort="id", after=None, fields=None, include_prediction=True, **filters):
+    """
+    Build the GET /patients/ statement: only the columns the response (and
+    scoring) needs, the SQL filters and one keyset or OFFSET page. `fields`
+    are API field names (default: all). Returns (sql, params); the caller
+    binds :limit and :skip.
+    """
+    columns = {RESPONSE_COLUMNS[field] for field in fields or RESPONSE_COLUMNS}
+    columns |= {"patient_id", *SORT_KEYS[sort]}
+    if include_prediction:
+        columns.update(PREDICTION_COLUMNS)
+
+    conditions, filter_params = patient_filters(**filters)
+    sql, params = page_query(sort, after, conditions, columns=", ".join(sorted(columns)))
+    return sql, {**params, **filter_params}
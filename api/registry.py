@@ -0,0 +1,189 @@
+"""
+api/registry.py
+Model registry: lazy loading, atomic hot reload and version pinning.
+
+Nothing is read from disk at import time. The first get() (normally the
+startup hook, on a worker thread) loads the pickle, runs a warm-up predict
+and only then publishes it. reload() builds and warms a new ModelHandle
+next to the current one and swaps a single reference, so requests that
+already took a handle finish on the model they started with and new
+requests only ever see a fully loaded model. A failed reload leaves the
+current model serving.
+
+The version is the first 12 hex chars of the file's sha256 (the same value
+used in prediction cache keys). With MODEL_VERSION_PIN set, a file with any
+other version is refused.
+
+The preprocessing artifact (api/preprocessing.py) is loaded with the model:
+handle.model scales its input with the training-time statistics, and the
+artifact's version is part of handle.cache_version so cached predictions
+never outlive a change of either file. Changing either file triggers a
+reload when watching.
+
+A MODEL_PATH ending in .npz is a native export (api/native_model.py) and is
+memory-mapped instead of unpickled, so serving it needs no TensorFlow.
+
+Optional .env settings:
+
+MODEL_PATH=models/heart_disease_model.h5.pkl   # pickled model (or .npz native export) to serve
+MODEL_VERSION_PIN=                             # only serve this version (sha256 prefix)
+MODEL_RELOAD_INTERVAL=0                        # seconds between file change checks (0 = off)
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from api.features import NUMERIC_DEFAULTS, encode_record
+from api.native_model import NATIVE_MODEL_SUFFIX, load_native_model
+from api.preprocessing import PREPROCESSOR_PATH, PreprocessedModel, load_preprocessor
+
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join("models", "heart_disease_model.h5.pkl"))
+MODEL_VERSION_PIN = os.getenv("MODEL_VERSION_PIN") or None
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "0"))
+
+
+def model_version(model_bytes):
+    return hashlib.sha256(model_bytes).hexdigest()[:12]
+
+
+def deserialize_model(path, model_bytes):
+    """The model in `path`: a memory-mapped native export or the unpickled bytes"""
+    if path.endswith(NATIVE_MODEL_SUFFIX):
+        return load_native_model(path)
+    return pickle.loads(model_bytes)
+
+
+class ModelHandle:
+    """A loaded, warmed-up model and the metadata reported with its predictions"""
+
+    def __init__(self, model, version, path, file_stat, preprocessor=None):
+        self.preprocessor = preprocessor
+        # Callers always get a model that takes encoded, unscaled features
+        self.model = model if preprocessor is None or preprocessor.identity else PreprocessedModel(model, preprocessor)
+        self.version = version
+        self.path = path
+        self.file_stat = file_stat  # (mtime, size) of model and artifact when loaded
+        self.loaded_at = datetime.now()
+
+    @property
+    def cache_version(self):
+        """Model version plus the preprocessing artifact's, for prediction cache keys"""
+        if self.preprocessor is None or self.preprocessor.identity:
+            return self.version
+        return f"{self.version}+{self.preprocessor.version}"
+
+    def info(self):
+        return {
+            "version": self.version,
+            "path": self.path,
+            "preprocessing": self.preprocessor.info() if self.preprocessor else None,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class ModelRegistry:
+    """Holds the current ModelHandle; get() loads lazily, reload() swaps atomically"""
+
+    def __init__(self, path=MODEL_PATH, pinned_version=MODEL_VERSION_PIN, preprocessor_path=PREPROCESSOR_PATH):
+        self.path = path
+        self.preprocessor_path = preprocessor_path
+        self.pinned_version = pinned_version
+        self._current = None
+        self._lock = threading.Lock()  # serializes loads, never held while serving
+        self._counters = {"loads": 0, "reloads": 0, "reload_failures": 0}
+        self.last_error = None
+        self._failed_stat = None
+
+    @property
+    def loaded(self):
+        return self._current is not None
+
+    def _file_stat(self, path):
+        stat = os.stat(path)
+        try:
+            artifact = os.stat(self.preprocessor_path)
+            artifact_stat = (artifact.st_mtime, artifact.st_size)
+        except OSError:
+            artifact_stat = None
+        return (stat.st_mtime, stat.st_size, artifact_stat)
+
+    def _load(self, path):
+        """Read, verify, load and warm up a model without publishing it"""
+        file_stat = self._file_stat(path)
+        with open(path, "rb") as f:
+            model_bytes = f.read()
+        version = model_version(model_bytes)
+        if self.pinned_version and version != self.pinned_version:
+            raise RuntimeError(f"{path} is model version {version}, pinned to {self.pinned_version}")
+
+        handle = ModelHandle(deserialize_model(path, model_bytes), version, path, file_stat,
+                             load_preprocessor(self.preprocessor_path))
+        # Warm-up: the first predict builds the graph / allocates buffers
+        warmup = np.array([encode_record(NUMERIC_DEFAULTS)], dtype=np.float64)
+        handle.model.predict(warmup)
+        return handle
+
+    def get(self):
+        """The current ModelHandle, loading it on first use"""
+        handle = self._current
+        if handle is not None:
+            return handle
+        with self._lock:
+            if self._current is None:
+                self._current = self._load(self.path)
+                self._counters["loads"] += 1
+            return self._current
+
+    def reload(self, path=None):
+        """Load `path` (default: the configured path) and swap it in; returns the new handle"""
+        with self._lock:
+            try:
+                handle = self._load(path or self.path)
+            except Exception as e:
+                self._counters["reload_failures"] += 1
+                self.last_error = str(e)
+                try:
+                    self._failed_stat = self._file_stat(path or self.path)
+                except OSError:
+                    pass
+                raise
+            self.path = handle.path
+            self._current = handle  # single reference swap
+            self._counters["reloads"] += 1
+            self.last_error = None
+            return handle
+
+    def changed_on_disk(self):
+        """True when the model file differs from the loaded one (and from the last failed attempt)"""
+        handle = self._current
+        try:
+            stat = self._file_stat(self.path)
+        except OSError:
+            return False
+        return handle is not None and stat != handle.file_stat and stat != self._failed_stat
+
+    def watch(self, interval=MODEL_RELOAD_INTERVAL, stop=None):
+        """Blocking loop (run on a thread): reload whenever the file changes"""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            if self.changed_on_disk():
+                try:
+                    handle = self.reload()
+                    print(f"🔄 Reloaded model version {handle.version}")
+                except Exception as e:
+                    print(f"⚠️ Model reload failed, still serving the previous version: {e}")
+
+    def info(self):
+        handle = self._current
+        return {
+            "loaded": handle is not None,
+            **(handle.info() if handle else {"path": self.path}),
+            "pinned_version": self.pinned_version,
+            "last_error": self.last_error,
+            **self._counters,
+        }
@@ -0,0 +1,77 @@
+"""
+api/scoring.py
+Request payloads for POST /predict/batch.
+
+Accepted bodies (API field names; any of the 13 features may be omitted and
+is then imputed like a NULL column in MySQL):
+
+* JSON records  - [{"age": 63, "sex": "Male", ...}, ...] or {"records": [...]}
+* JSON columns  - {"columns": {"age": [63, 67], "sex": ["Male", "Male"], ...}}
+* Arrow IPC     - a record batch stream (Content-Type: application/vnd.apache.arrow.stream)
+
+Every form is turned into one column mapping that features.encode_columns
+encodes in a single vectorized pass, so a batch costs one encode and one
+predict call however many rows it has.
+"""
+
+import json
+
+from api.features import FEATURE_COLUMNS
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional, only needed for Arrow request bodies
+    pa = None
+
+PREDICT_BATCH_MAX_ROWS = 50_000
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def records_to_columns(records):
+    """Column mapping from a list of record dicts; returns (columns, n)"""
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise ValueError("records must be a list of objects")
+    return {name: [record.get(name) for record in records] for name in FEATURE_COLUMNS}, len(records)
+
+
+def complete_columns(columns):
+    """Validate a {name: values} mapping and fill omitted features; returns (columns, n)"""
+    if not isinstance(columns, dict) or not all(isinstance(v, list) for v in columns.values()):
+        raise ValueError("columns must be an object of arrays")
+    lengths = {len(values) for name, values in columns.items() if name in FEATURE_COLUMNS}
+    if len(lengths) > 1:
+        raise ValueError("all columns must have the same length")
+    n = lengths.pop() if lengths else 0
+    return {name: columns[name] if name in columns else [None] * n for name in FEATURE_COLUMNS}, n
+
+
+def arrow_to_columns(body):
+    """Column mapping from an Arrow IPC stream; returns (columns, n)"""
+    table = pa.ipc.open_stream(body).read_all()
+    columns = {
+        name: table.column(name).to_numpy(zero_copy_only=False) if name in table.column_names
+        else [None] * table.num_rows
+        for name in FEATURE_COLUMNS
+    }
+    return columns, table.num_rows
+
+
+def parse_payload(body, content_type=""):
+    """(columns, n) for a JSON or Arrow request body; raises ValueError if it is malformed"""
+    if ARROW_MEDIA_TYPE in content_type:
+        try:
+            return arrow_to_columns(body)
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Invalid Arrow stream: {e}") from e
+
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+
+    if isinstance(payload, dict) and "columns" in payload:
+        return complete_columns(payload["columns"])
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+    return records_to_columns(payload)
+
@@ -0,0 +1,24 @@
+-- database/sql/migrations/001_patient_indexes.sql
+-- Secondary / covering indexes for the API's patient queries.
+-- Run once on an existing database:
+--   mysql -u -p heart_disease_predictor < database/sql/migrations/001_patient_indexes.sql
+-- (fresh installs get the same indexes from schema.sql)
+USE heart_disease_predictor;
+
+-- /patients/latest/data (ORDER BY record_created_at DESC LIMIT 1) and
+-- keyset pages with sort=created_at: index seek instead of scan + filesort
+ALTER TABLE `patients` ADD INDEX `idx_patients_created_at` (`record_created_at`, `patient_id`);
+
+-- Incremental sync / cache checks on record_updated_at; covers
+-- SELECT patient_id, record_updated_at ... WHERE record_updated_at > ?
+ALTER TABLE `patients` ADD INDEX `idx_patients_updated_at` (`record_updated_at`, `patient_id`);
+
+-- Filtering by data_source and/or diagnosis, ordered by patient_id
+-- (data_source alone is already indexed by fk_patients_dataset)
+ALTER TABLE `patients` ADD INDEX `idx_patients_source_diagnosis` (`data_source`, `heart_disease_diagnosis`, `patient_id`);
+ALTER TABLE `patients` ADD INDEX `idx_patients_diagnosis` (`heart_disease_diagnosis`, `patient_id`);
+
+-- Age range filters
+ALTER TABLE `patients` ADD INDEX `idx_patients_age` (`patient_age`, `patient_id`);
+
+ANALYZE TABLE `patients`;
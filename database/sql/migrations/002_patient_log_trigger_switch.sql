@@ -0,0 +1,25 @@
+-- database/sql/migrations/002_patient_log_trigger_switch.sql
+-- Let bulk loaders skip the per-row audit insert and backfill patient_logs
+-- in one INSERT ... SELECT instead (api/loader.py fast_load_csv --defer-logs).
+-- The trigger only writes a log row when @disable_patient_log is unset, and
+-- that variable is per connection, so other sessions keep logging as before.
+-- Run once on an existing database:
+--   mysql -u -p heart_disease_predictor < database/sql/migrations/002_patient_log_trigger_switch.sql
+-- (fresh installs get the same trigger from procedures.sql)
+USE heart_disease_predictor;
+
+DROP TRIGGER IF EXISTS after_patient_insert;
+
+DELIMITER //
+
+CREATE TRIGGER after_patient_insert
+AFTER INSERT ON patients
+FOR EACH ROW
+BEGIN
+  IF @disable_patient_log IS NULL THEN
+    INSERT INTO patient_logs (patient_id, action_type)
+    VALUES (NEW.patient_id, 'INSERT');
+  END IF;
+END //
+
+DELIMITER ;
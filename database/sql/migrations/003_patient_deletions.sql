@@ -0,0 +1,29 @@
+-- database/sql/migrations/003_patient_deletions.sql
+-- Tombstones for deleted patients, so the incremental Mongo sync
+-- (api/mongo_sync.py) can remove them: deleting a patient also deletes its
+-- patient_logs rows (foreign key), so the audit log cannot record it.
+-- patient_deletions has no foreign key and outlives the patient row.
+-- Run once on an existing database:
+--   mysql -u -p heart_disease_predictor < database/sql/migrations/003_patient_deletions.sql
+-- (fresh installs get the same table from schema.sql and trigger from procedures.sql)
+USE heart_disease_predictor;
+
+CREATE TABLE IF NOT EXISTS patient_deletions (
+  deletion_id INT AUTO_INCREMENT PRIMARY KEY,
+  patient_id INT NOT NULL,
+  deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+DROP TRIGGER IF EXISTS after_patient_delete;
+
+DELIMITER //
+
+CREATE TRIGGER after_patient_delete
+AFTER DELETE ON patients
+FOR EACH ROW
+BEGIN
+  INSERT INTO patient_deletions (patient_id)
+  VALUES (OLD.patient_id);
+END //
+
+DELIMITER ;
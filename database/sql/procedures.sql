@@ -61,8 +61,20 @@ CREATE TRIGGER after_patient_insert
 AFTER INSERT ON patients
 FOR EACH ROW
 BEGIN
-  INSERT INTO patient_logs (patient_id, action_type)
-  VALUES (NEW.patient_id, 'INSERT');
+  -- Bulk loaders set @disable_patient_log and backfill patient_logs afterwards
+  IF @disable_patient_log IS NULL THEN
+    INSERT INTO patient_logs (patient_id, action_type)
+    VALUES (NEW.patient_id, 'INSERT');
+  END IF;
+END //
+
+CREATE TRIGGER after_patient_delete
+AFTER DELETE ON patients
+FOR EACH ROW
+BEGIN
+  -- Tombstone for the Mongo sync (the patient's patient_logs rows are gone)
+  INSERT INTO patient_deletions (patient_id)
+  VALUES (OLD.patient_id);
 END //
 
 DELIMITER ;
@@ -53,6 +53,14 @@ CREATE TABLE patient_logs (
   logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Deleted patient ids for the Mongo sync; no foreign key, so rows outlive
+-- the patient (see migrations/003_patient_deletions.sql)
+CREATE TABLE patient_deletions (
+  deletion_id INT AUTO_INCREMENT PRIMARY KEY,
+  patient_id INT NOT NULL,
+  deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create main patients table
 CREATE TABLE `patients` (
     `patient_id` INT NOT NULL,
@@ -73,7 +81,13 @@ CREATE TABLE `patients` (
     `heart_disease_diagnosis` INT NULL,
     record_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     record_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    PRIMARY KEY (`patient_id`)
+    PRIMARY KEY (`patient_id`),
+    -- Secondary indexes (see migrations/001_patient_indexes.sql)
+    INDEX `idx_patients_created_at` (`record_created_at`, `patient_id`),
+    INDEX `idx_patients_updated_at` (`record_updated_at`, `patient_id`),
+    INDEX `idx_patients_source_diagnosis` (`data_source`, `heart_disease_diagnosis`, `patient_id`),
+    INDEX `idx_patients_diagnosis` (`heart_disease_diagnosis`, `patient_id`),
+    INDEX `idx_patients_age` (`patient_age`, `patient_id`)
 );
 
 -- Add foreign key constraints
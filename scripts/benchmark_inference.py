@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-row vs batched inference for GET /patients/ pages.
+
+Per-row mirrors the old behaviour (one model.predict per patient), batched
+encodes the whole page and calls model.predict once.
+
+Usage:
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --sizes 10 100 1000 --repeat 5
+"""
+
+import argparse
+import os
+import pickle
+import random
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.features import CATEGORIES
+from api.inference import predict_batch
+
+MODEL_PATH = os.path.join("models", "heart_disease_model.h5.pkl")
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+PatientRow = namedtuple("PatientRow", [
+    "patient_id", "patient_age", "gender", "data_source", "chest_pain_type",
+    "resting_blood_pressure", "cholesterol_level", "fasting_blood_sugar",
+    "resting_ecg_results", "max_heart_rate", "exercise_induced_angina",
+    "st_depression", "exercise_peak_slope", "major_vessels_count",
+    "thalassemia_type", "heart_disease_diagnosis", "record_created_at",
+])
+
+
+def synthetic_patients(n, seed=42):
+    """Generate n rows shaped like `SELECT * FROM patients` results"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        PatientRow(
+            patient_id=i + 1,
+            patient_age=rng.randint(29, 77),
+            gender=rng.choice(["Male", "Female"]),
+            data_source=rng.choice(["Cleveland", "Hungary", "Switzerland", "VA Long Beach"]),
+            chest_pain_type=rng.choice(CATEGORIES["cp"]),
+            resting_blood_pressure=rng.randint(94, 200),
+            cholesterol_level=rng.randint(126, 564),
+            fasting_blood_sugar=rng.choice(["TRUE", "FALSE"]),
+            resting_ecg_results=rng.choice(CATEGORIES["restecg"]),
+            max_heart_rate=rng.randint(71, 202),
+            exercise_induced_angina=rng.choice(["TRUE", "FALSE"]),
+            st_depression=round(rng.uniform(0, 6.2), 1),
+            exercise_peak_slope=rng.choice(CATEGORIES["slope"]),
+            major_vessels_count=rng.randint(0, 3),
+            thalassemia_type=rng.choice(CATEGORIES["thal"]),
+            heart_disease_diagnosis=rng.randint(0, 4),
+            record_created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def time_call(fn, repeat):
+    """Return the best wall-clock time of `repeat` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes, repeat):
+    with open(MODEL_PATH, "rb") as f:
+        model = pickle.load(f)
+
+    # Warm up once so graph building / lazy init doesn't skew the first size
+    predict_batch(model, synthetic_patients(1))
+
+    print(f"{'page size':>10} {'per-row (s)':>12} {'batched (s)':>12} {'speedup':>9}")
+    print("-" * 46)
+    for size in sizes:
+        patients = synthetic_patients(size)
+
+        per_row = time_call(lambda: [predict_batch(model, [p]) for p in patients], repeat)
+        batched = time_call(lambda: predict_batch(model, patients), repeat)
+
+        print(f"{size:>10,} {per_row:>12.4f} {batched:>12.4f} {per_row / batched:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.repeat)
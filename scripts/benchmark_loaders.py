@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CSV loaders against each other on a synthetic file.
+
+Loads the same CSV into a scratch schema (`CREATE TABLE ... LIKE` copies of
+`patients` / `patient_logs` plus the after_patient_insert trigger) with:
+
+  executemany   api.loader.load_csv (chunked executemany, the default path)
+  values        fast_load_csv(method="values")  large INSERT ... VALUES
+  infile        fast_load_csv(method="infile")  LOAD DATA LOCAL INFILE
+
+each with the trigger on and, for the fast paths, with --defer-logs
+(trigger skipped + one set-based patient_logs backfill). Tables are
+truncated between runs and the log count is checked against the row count.
+
+Usage:
+    python scripts/benchmark_loaders.py --rows 1000000
+    python scripts/benchmark_loaders.py --csv data/synthetic.csv --chunk-size 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.database import engine
+from api.loader import LOAD_CHUNK_SIZE, fast_load_csv, load_csv
+from make_synthetic_csv import make_csv
+
+SCRATCH_SCHEMA = "heart_load_bench"
+
+# Same definition as database/sql/migrations/002_patient_log_trigger_switch.sql
+TRIGGER_SQL = """
+    CREATE TRIGGER after_patient_insert
+    AFTER INSERT ON patients
+    FOR EACH ROW
+    BEGIN
+      IF @disable_patient_log IS NULL THEN
+        INSERT INTO patient_logs (patient_id, action_type)
+        VALUES (NEW.patient_id, 'INSERT');
+      END IF;
+    END
+"""
+
+RUNS = [
+    ("executemany", None, False),
+    ("values", "values", False),
+    ("values + deferred logs", "values", True),
+    ("infile", "infile", False),
+    ("infile + deferred logs", "infile", True),
+]
+
+
+def build_scratch_schema(conn, source):
+    conn.execute(text(f"DROP DATABASE IF EXISTS {SCRATCH_SCHEMA}"))
+    conn.execute(text(f"CREATE DATABASE {SCRATCH_SCHEMA}"))
+    for name in ("patients", "patient_logs"):
+        conn.execute(text(f"CREATE TABLE {SCRATCH_SCHEMA}.{name} LIKE {source}.{name}"))
+    conn.execute(text(f"USE {SCRATCH_SCHEMA}"))
+    conn.execute(text(TRIGGER_SQL))
+    conn.execute(text(f"USE {source}"))
+
+
+def reset_tables(bench_engine):
+    with bench_engine.begin() as conn:
+        conn.execute(text("TRUNCATE TABLE patient_logs"))
+        conn.execute(text("TRUNCATE TABLE patients"))
+
+
+def count_rows(bench_engine):
+    with bench_engine.connect() as conn:
+        patients = conn.execute(text("SELECT COUNT(*) FROM patients")).scalar()
+        logs = conn.execute(text("SELECT COUNT(*) FROM patient_logs")).scalar()
+    return patients, logs
+
+
+def run_benchmark(csv_path, chunk_size, keep):
+    with engine.connect() as conn:
+        source = conn.execute(text("SELECT DATABASE()")).scalar()
+        build_scratch_schema(conn, source)
+
+    bench_engine = create_engine(engine.url.set(database=SCRATCH_SCHEMA))
+    results = []
+    try:
+        for name, method, defer_logs in RUNS:
+            reset_tables(bench_engine)
+            print(f"\n🔄 {name}")
+            try:
+                if method is None:
+                    stats = load_csv(csv_path, sessionmaker(bind=bench_engine), chunk_size=chunk_size)
+                else:
+                    stats = fast_load_csv(csv_path, bench_engine, chunk_size=chunk_size,
+                                          method=method, defer_logs=defer_logs)
+            except Exception as e:
+                print(f"❌ {name} failed: {e}")
+                continue
+            patients, logs = count_rows(bench_engine)
+            results.append((name, stats, patients == logs == stats["rows"]))
+    finally:
+        bench_engine.dispose()
+        if not keep:
+            with engine.connect() as conn:
+                conn.execute(text(f"DROP DATABASE IF EXISTS {SCRATCH_SCHEMA}"))
+
+    print(f"\n{'loader':<26} {'rows':>12} {'seconds':>9} {'rows/sec':>12}  logs")
+    print("-" * 70)
+    for name, stats, logs_ok in results:
+        print(f"{name:<26} {stats['rows']:>12,} {stats['seconds']:>9.1f} "
+              f"{stats['rows_per_sec']:>12,.0f}  {'✅' if logs_ok else '❌ mismatch'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CSV loader throughput")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic rows when --csv is not given")
+    parser.add_argument("--csv", help="existing CSV to load instead of a synthetic one")
+    parser.add_argument("--chunk-size", type=int, default=LOAD_CHUNK_SIZE)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    if args.csv:
+        run_benchmark(args.csv, args.chunk_size, args.keep)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "synthetic.csv")
+            make_csv(args.rows, path, seed=0)
+            run_benchmark(path, args.chunk_size, args.keep)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark micro-batched vs per-request inference for single-patient calls.
+
+C concurrent coroutines each score single rows back to back, the way
+concurrent GET /patients/{id} requests do. "per-request" is the old
+behaviour (one model.predict per request, on the event loop); the other
+rows run through api.batcher.MicroBatcher with different windows, trading
+a little latency at low concurrency for throughput at high concurrency.
+With --backend process the batches are scored by api.inference_pool
+worker processes (INFERENCE_BACKEND=process) instead of one thread.
+
+Usage:
+    python scripts/benchmark_microbatch.py
+    python scripts/benchmark_microbatch.py --concurrency 1 16 64 256 --windows 0.5 2 5 --requests 5000
+    python scripts/benchmark_microbatch.py --backend process --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.batcher import INFERENCE_BATCH_MAX_ROWS, MicroBatcher
+from api.features import encode_rows
+from api.inference import predict_matrix
+from api.inference_pool import INFERENCE_WORKERS, InferencePool
+from api.registry import ModelHandle, model_version
+from benchmark_inference import MODEL_PATH, synthetic_patients
+
+DEFAULT_CONCURRENCY = [1, 16, 64, 256]
+DEFAULT_WINDOWS = [0.5, 2.0, 5.0]
+
+
+async def run_clients(score, rows, concurrency, total):
+    """`concurrency` workers issue `total` single-row calls; returns (seconds, latencies)"""
+    latencies = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            await score(rows[i % len(rows)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+def report(concurrency, mode, seconds, latencies, avg_batch):
+    ms = np.array(latencies) * 1000
+    print(f"{concurrency:>6} {mode:<18} {len(latencies) / seconds:>10,.0f} "
+          f"{np.percentile(ms, 50):>9.2f} {np.percentile(ms, 99):>9.2f} {avg_batch:>9.1f}")
+
+
+async def run_benchmark(concurrency_levels, windows, total, max_rows, backend="thread", workers=INFERENCE_WORKERS):
+    with open(MODEL_PATH, "rb") as f:
+        model_bytes = f.read()
+    handle = ModelHandle(pickle.loads(model_bytes), model_version(model_bytes), MODEL_PATH, None)
+    pool = None
+    if backend == "process":
+        pool = InferencePool(workers=workers)
+        pool.start(handle)
+    rows = [row.reshape(1, -1) for row in encode_rows(synthetic_patients(1000))]
+    model = handle.model
+    predict_matrix(model, rows[0])  # warm up
+
+    async def per_request(X):
+        await asyncio.sleep(0)  # let other requests in, as the event loop would
+        return predict_matrix(model, X)
+
+    print(f"{'conc.':>6} {'mode':<18} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'avg batch':>9}")
+    print("-" * 66)
+    for concurrency in concurrency_levels:
+        seconds, latencies = await run_clients(per_request, rows, concurrency, total)
+        report(concurrency, "per-request", seconds, latencies, 1.0)
+
+        for window in windows:
+            batcher = (
+                MicroBatcher(window_ms=window, max_rows=max_rows, predict=pool.predict_raw, threads=pool.workers)
+                if pool else MicroBatcher(window_ms=window, max_rows=max_rows)
+            )
+            seconds, latencies = await run_clients(
+                lambda X: batcher.predict_rows(handle, X), rows, concurrency, total
+            )
+            report(concurrency, f"batch {window:g}ms/{max_rows}", seconds, latencies, batcher.stats()["avg_batch"])
+            batcher.close()
+    if pool:
+        pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--windows", type=float, nargs="+", default=DEFAULT_WINDOWS, help="batch windows in ms")
+    parser.add_argument("--max-rows", type=int, default=INFERENCE_BATCH_MAX_ROWS)
+    parser.add_argument("--requests", type=int, default=2000, help="single-row calls per run")
+    parser.add_argument("--backend", choices=["thread", "process"], default="thread", help="where batches are scored")
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS, help="worker processes with --backend process")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.concurrency, args.windows, args.requests, args.max_rows,
+                              args.backend, args.workers))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark LIMIT/OFFSET vs keyset (cursor) pages on a large synthetic table.
+
+Builds `patients_pagination_bench` (same columns as `patients`, filled by
+repeated self-doubling inserts) and times fetching one page at increasing
+depths with both strategies, using the same SQL as GET /patients/.
+
+Usage:
+    python scripts/benchmark_pagination.py --rows 5000000
+    python scripts/benchmark_pagination.py --rows 5000000 --reuse   # keep an existing bench table
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.database import engine
+from api.pagination import page_query
+
+BENCH_TABLE = "patients_pagination_bench"
+PAGE_SIZE = 100
+
+
+def build_table(conn, rows):
+    """(Re)create the bench table and fill it with `rows` rows by doubling"""
+    conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    conn.execute(text(f"""
+        CREATE TABLE {BENCH_TABLE} (
+            patient_id INT NOT NULL PRIMARY KEY,
+            patient_age INT, gender ENUM('Male', 'Female'), data_source VARCHAR(50),
+            chest_pain_type VARCHAR(50), resting_blood_pressure INT, cholesterol_level INT,
+            fasting_blood_sugar ENUM('TRUE', 'FALSE'), resting_ecg_results VARCHAR(50),
+            max_heart_rate INT, exercise_induced_angina ENUM('TRUE', 'FALSE'),
+            st_depression FLOAT, exercise_peak_slope VARCHAR(50), major_vessels_count INT,
+            thalassemia_type VARCHAR(50), heart_disease_diagnosis INT,
+            record_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            record_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    conn.execute(text(f"""
+        INSERT INTO {BENCH_TABLE} VALUES (
+            1, 63, 'Male', 'Cleveland', 'typical angina', 145, 233, 'TRUE',
+            'lv hypertrophy', 150, 'FALSE', 2.3, 'downsloping', 0, 'fixed defect', 0,
+            NOW(), NOW()
+        )
+    """))
+
+    count = 1
+    while count < rows:
+        batch = min(count, rows - count)
+        conn.execute(text(f"""
+            INSERT INTO {BENCH_TABLE}
+            SELECT patient_id + :offset, patient_age, gender, data_source, chest_pain_type,
+                   resting_blood_pressure, cholesterol_level, fasting_blood_sugar,
+                   resting_ecg_results, max_heart_rate, exercise_induced_angina,
+                   st_depression, exercise_peak_slope, major_vessels_count,
+                   thalassemia_type, heart_disease_diagnosis, record_created_at, record_updated_at
+            FROM {BENCH_TABLE} WHERE patient_id <= :batch
+        """), {"offset": count, "batch": batch})
+        conn.commit()
+        count += batch
+        print(f"  ... {count:,} rows")
+
+
+def time_query(conn, sql, params, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(rows, reuse, repeat):
+    with engine.connect() as conn:
+        existing = conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :t"
+        ), {"t": BENCH_TABLE}).scalar()
+        if not (reuse and existing):
+            print(f"🔄 Building {BENCH_TABLE} with {rows:,} rows...")
+            build_table(conn, rows)
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM {BENCH_TABLE}")).scalar()
+
+        offset_sql, _ = page_query("id", None, table=BENCH_TABLE)
+        keyset_sql, _ = page_query("id", [0], table=BENCH_TABLE)
+
+        depths = [d for d in (0, 10_000, 100_000, 1_000_000, rows // 2, rows - PAGE_SIZE) if 0 <= d < rows]
+        print(f"\n{'depth':>12} {'OFFSET (ms)':>12} {'keyset (ms)':>12}")
+        print("-" * 38)
+        for depth in sorted(set(depths)):
+            offset_s = time_query(conn, offset_sql, {"limit": PAGE_SIZE, "skip": depth}, repeat)
+            # ids are contiguous from 1, so the row at `depth` has id == depth
+            keyset_s = time_query(conn, keyset_sql, {"limit": PAGE_SIZE, "after_id": depth}, repeat)
+            print(f"{depth:>12,} {offset_s * 1000:>12.2f} {keyset_s * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OFFSET vs keyset pagination benchmark")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing bench table")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.reuse, args.repeat)
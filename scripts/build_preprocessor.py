@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Fit the preprocessing artifact (scaler statistics + category maps) on the
+training CSV and save it next to the model.
+
+Run this whenever the model is retrained with standardized features; the
+API and the prediction scripts then apply the same scaling to every row.
+Without the artifact they feed the model unscaled encoded features.
+
+Usage:
+    python scripts/build_preprocessor.py
+    python scripts/build_preprocessor.py --csv data/heart.csv --out models/heart_disease_model.preprocessing.json
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.feature_store import FEATURE_STORE_PATH, FeatureStore, build_from_csv
+from api.features import FEATURE_COLUMNS
+from api.preprocessing import PREPROCESSOR_PATH, Preprocessor
+
+CSV_PATH = "data/heart.csv"
+
+
+def build_preprocessor(csv_path=CSV_PATH, out=PREPROCESSOR_PATH, store_path=FEATURE_STORE_PATH):
+    # The encoded feature matrix comes from the (refreshed) feature store
+    build_from_csv(csv_path, store_path)
+    X = FeatureStore(store_path).feature_matrix()
+    preprocessor = Preprocessor.fit(X)
+    preprocessor.save(out)
+    print(f"✅ Fitted on {len(X):,} rows, saved {out} (version {preprocessor.version})")
+    for name, mean, scale in zip(FEATURE_COLUMNS, preprocessor.mean, preprocessor.scale):
+        print(f"   {name:<10} mean {mean:>9.3f}  scale {scale:>8.3f}")
+    return preprocessor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_PATH, help="training CSV")
+    parser.add_argument("--out", default=PREPROCESSOR_PATH, help="artifact path")
+    parser.add_argument("--store", default=FEATURE_STORE_PATH, help="feature store built from --csv")
+    args = parser.parse_args()
+    build_preprocessor(args.csv, args.out, args.store)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN every query the API endpoints run against a large synthetic copy of
+the patients table and fail if any of them falls back to a full scan.
+
+The check builds a scratch schema with `CREATE TABLE ... LIKE` copies of
+`patients` / `patient_logs` (same indexes as the live tables), fills it
+with synthetic rows, runs ANALYZE and EXPLAINs each statement from
+api/queries.py. GET /patients/ is checked with the statements
+list_patients_query builds for every filter x sort x first page / cursor
+page x projection combination, so the plans are the ones the endpoint
+actually gets. Exit code is 1 if any plan is a full table scan, a full
+index scan or a large filesort, so it can gate CI.
+
+Usage:
+    python scripts/check_query_plans.py                  # 1M rows
+    python scripts/check_query_plans.py --rows 5000000 --keep
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.database import engine
+from api.pagination import SORT_KEYS
+from api.queries import (
+    DELETE_PATIENT, DELETE_PATIENT_LOGS, SELECT_LATEST_PATIENT, SELECT_PATIENT_BY_ID, UPDATE_PATIENT,
+    list_patients_query,
+)
+
+SCRATCH_SCHEMA = "heart_plan_check"
+PAGE_SIZE = 100
+
+# Any plan touching more rows than this without a usable index is a failure
+MAX_SCANNED_ROWS = 10_000
+
+# GET /patients/ filter sets (query parameters) checked with every sort
+LIST_FILTERS = {
+    "none": {},
+    "dataset": {"dataset": "Hungary"},
+    "dataset_num": {"dataset": "Hungary", "num": 1},
+    "num": {"num": 0},
+    "age_range": {"min_age": 70, "max_age": 72},
+    "min_age": {"min_age": 75},
+    "max_age": {"max_age": 30},
+    "cp": {"cp": "typical angina"},
+    "cp_age": {"cp": "typical angina", "min_age": 70, "max_age": 72},
+    "created_window": {"created_after": "2000-01-01", "created_before": "2100-01-01"},
+}
+
+# `fields=` projections: the default response (with prediction columns) and a narrow one
+LIST_PROJECTIONS = {
+    "full": {"fields": None, "include_prediction": True},
+    "fields": {"fields": ["id", "age", "num"], "include_prediction": False},
+}
+
+SYNTHETIC_COLUMNS = """
+    patient_id, patient_age, gender, data_source, chest_pain_type,
+    resting_blood_pressure, cholesterol_level, fasting_blood_sugar,
+    resting_ecg_results, max_heart_rate, exercise_induced_angina,
+    st_depression, exercise_peak_slope, major_vessels_count,
+    thalassemia_type, heart_disease_diagnosis, record_created_at, record_updated_at
+"""
+
+# Every column derived from n so values are spread like real data
+SYNTHETIC_VALUES = """
+    n, 29 + n % 48, ELT(1 + n % 2, 'Male', 'Female'),
+    ELT(1 + n % 4, 'Cleveland', 'Hungary', 'Switzerland', 'VA Long Beach'),
+    ELT(1 + n % 4, 'typical angina', 'atypical angina', 'non-anginal', 'asymptomatic'),
+    94 + n % 107, 126 + n % 439, ELT(1 + n % 2, 'TRUE', 'FALSE'),
+    ELT(1 + n % 3, 'normal', 'st-t abnormality', 'lv hypertrophy'),
+    71 + n % 132, ELT(1 + n % 2, 'TRUE', 'FALSE'), (n % 62) / 10,
+    ELT(1 + n % 3, 'upsloping', 'flat', 'downsloping'), n % 4,
+    ELT(1 + n % 3, 'normal', 'fixed defect', 'reversable defect'), n % 5,
+    NOW() - INTERVAL n SECOND, NOW() - INTERVAL n SECOND
+"""
+
+
+def endpoint_queries(rows):
+    """(name, sql, params) for every statement the API endpoints execute"""
+    middle = rows // 2
+    queries = [
+        ("get_patient", SELECT_PATIENT_BY_ID, {"patient_id": middle}),
+        ("latest_patient", SELECT_LATEST_PATIENT, {}),
+        ("update_patient",
+         UPDATE_PATIENT.format(assignments="patient_age = :age"), {"patient_id": middle, "age": 50}),
+        ("delete_patient_logs", DELETE_PATIENT_LOGS, {"patient_id": middle}),
+        ("delete_patient", DELETE_PATIENT, {"patient_id": middle}),
+    ]
+
+    cursors = {
+        "id": [middle],
+        "created_at": [datetime.now() - timedelta(seconds=middle), middle],
+    }
+    for sort, (filter_name, filters), paged, (projection, options) in itertools.product(
+        SORT_KEYS, LIST_FILTERS.items(), (False, True), LIST_PROJECTIONS.items()
+    ):
+        sql, params = list_patients_query(sort, cursors[sort] if paged else None, **options, **filters)
+        name = f"list_{sort}_{filter_name}_{'cursor' if paged else 'first'}_{projection}"
+        queries.append((name, sql, {**params, "limit": PAGE_SIZE, "skip": 0}))
+    return queries
+
+
+def build_scratch_schema(conn, source, rows):
+    """Copy the live table definitions into SCRATCH_SCHEMA and fill them"""
+    conn.execute(text(f"DROP DATABASE IF EXISTS {SCRATCH_SCHEMA}"))
+    conn.execute(text(f"CREATE DATABASE {SCRATCH_SCHEMA}"))
+    for table in ("patients", "patient_logs"):
+        conn.execute(text(f"CREATE TABLE {SCRATCH_SCHEMA}.{table} LIKE {source}.{table}"))
+
+    target = f"{SCRATCH_SCHEMA}.patients"
+    conn.execute(text(
+        f"INSERT INTO {target} ({SYNTHETIC_COLUMNS}) SELECT {SYNTHETIC_VALUES} FROM (SELECT 1 AS n) AS src"
+    ))
+    count = 1
+    while count < rows:
+        batch = min(count, rows - count)
+        conn.execute(text(
+            f"INSERT INTO {target} ({SYNTHETIC_COLUMNS}) SELECT {SYNTHETIC_VALUES} "
+            f"FROM (SELECT patient_id + :offset AS n FROM {target} WHERE patient_id <= :batch) AS src"
+        ), {"offset": count, "batch": batch})
+        conn.commit()
+        count += batch
+
+    conn.execute(text(f"ANALYZE TABLE {target}")).fetchall()
+
+
+def plan_problems(plan):
+    """Return human readable problems found in EXPLAIN output rows"""
+    problems = []
+    for step in plan:
+        table, access, rows = step.get("table"), step.get("type"), step.get("rows") or 0
+        extra = step.get("Extra") or ""
+        if table not in ("patients", "patient_logs"):
+            continue
+        if access == "ALL" and rows > MAX_SCANNED_ROWS:
+            problems.append(f"full table scan of {table} (~{rows:,} rows)")
+        elif access == "index" and rows > MAX_SCANNED_ROWS:
+            problems.append(f"full index scan of {table} via {step.get('key')} (~{rows:,} rows)")
+        if "Using filesort" in extra and rows > MAX_SCANNED_ROWS:
+            problems.append(f"filesort over ~{rows:,} rows of {table}")
+    return problems
+
+
+def check_query_plans(rows, keep):
+    failures = 0
+    with engine.connect() as conn:
+        source = conn.execute(text("SELECT DATABASE()")).scalar()
+        print(f"🔄 Building {SCRATCH_SCHEMA}.patients with {rows:,} synthetic rows...")
+        build_scratch_schema(conn, source, rows)
+
+        try:
+            conn.execute(text(f"USE {SCRATCH_SCHEMA}"))
+            print(f"\n{'query':<44} {'type':<8} {'key':<32} {'rows':>10}  result")
+            print("-" * 106)
+            for name, sql, params in endpoint_queries(rows):
+                result = conn.execute(text("EXPLAIN " + sql), params)
+                plan = [dict(row._mapping) for row in result]
+                problems = plan_problems(plan)
+                first = plan[0] if plan else {}
+                status = "✅" if not problems else "❌ " + "; ".join(problems)
+                print(f"{name:<44} {str(first.get('type')):<8} {str(first.get('key')):<32} "
+                      f"{first.get('rows') or 0:>10,}  {status}")
+                failures += bool(problems)
+            conn.rollback()
+        finally:
+            conn.execute(text(f"USE {source}"))
+            if not keep:
+                conn.execute(text(f"DROP DATABASE IF EXISTS {SCRATCH_SCHEMA}"))
+
+    if failures:
+        print(f"\n❌ {failures} endpoint queries fall back to a full scan")
+    else:
+        print("\n🎉 Every endpoint query is index-backed")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if an endpoint query plan is a full scan")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCRATCH_SCHEMA} schema afterwards")
+    args = parser.parse_args()
+    sys.exit(0 if check_query_plans(args.rows, args.keep) else 1)
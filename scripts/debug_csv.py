@@ -1,96 +1,104 @@
 #!/usr/bin/env python3
 """
 Debug script to analyze the CSV data and find problematic rows
+
+Reads the memory-mapped feature store (refreshed from the CSV first, which
+is a no-op when the CSV has not changed) instead of re-parsing the text.
 """
 
-import pandas as pd
+import os
+import sys
+
 import numpy as np
 
-def debug_csv_data():
+# Add parent directory to path to import from api
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.feature_store import FEATURE_STORE_PATH, FeatureStore, build_from_csv
+
+CSV_PATH = 'data/heart.csv'
+
+
+def debug_csv_data(csv_path=CSV_PATH, store_path=FEATURE_STORE_PATH):
     """Debug the CSV data to find NaN values and problematic rows"""
     try:
-        # Read the CSV file
-        df = pd.read_csv('data/heart.csv')
-        print(f"Total records: {len(df)}")
-        print(f"Columns: {list(df.columns)}")
+        build_from_csv(csv_path, store_path)
+        store = FeatureStore(store_path)
+        print(f"Total records: {len(store)}")
+        print(f"Columns: {store.columns}")
         print("\n" + "="*50)
-        
-        # Check for NaN values in each column
+
+        # NaN counts come straight from the build (no column is read)
         print("NaN values per column:")
-        for col in df.columns:
-            nan_count = df[col].isna().sum()
+        for col, nan_count in store.null_counts().items():
             if nan_count > 0:
                 print(f"  {col}: {nan_count} NaN values")
-        
+
         print("\n" + "="*50)
-        
+
+        nulls = np.column_stack([store.nulls(col) for col in store.columns])
+
         # Check specific problematic rows mentioned in error (around 916, 918, 920)
         problematic_rows = [915, 916, 917, 918, 919, 920]  # 0-indexed
-        
+
         print("Checking problematic rows:")
         for idx in problematic_rows:
-            if idx < len(df):
-                row = df.iloc[idx]
+            if idx < len(store):
                 print(f"\nRow {idx + 1} (0-indexed: {idx}):")
-                has_nan = False
-                for col in df.columns:
-                    value = row[col]
-                    if pd.isna(value) or str(value).lower() == 'nan':
-                        print(f"  {col}: {value} (NaN detected)")
-                        has_nan = True
+                for col, is_null in zip(store.columns, nulls[idx]):
+                    meta = store.info(col)
+                    if is_null:
+                        print(f"  {col}: nan (NaN detected)")
+                    elif "categories" in meta:
+                        print(f"  {col}: {store.decoded(col)[idx]}")
                     else:
-                        print(f"  {col}: {value}")
-                
-                if not has_nan:
+                        print(f"  {col}: {store.column(col)[idx]}")
+
+                if not nulls[idx].any():
                     print("  No NaN values found in this row")
-        
+
         print("\n" + "="*50)
-        
-        # Check data types
+
+        # Stored (encoded) data types
         print("Data types:")
-        print(df.dtypes)
-        
+        for col in store.columns:
+            meta = store.info(col)
+            print(f"  {col}: {meta['dtype']} ({meta['kind']})")
+
         print("\n" + "="*50)
-        
+
         # Check for any rows with all NaN values
-        all_nan_rows = df[df.isna().all(axis=1)]
+        all_nan_rows = np.flatnonzero(nulls.all(axis=1))
         if len(all_nan_rows) > 0:
             print(f"Found {len(all_nan_rows)} rows with all NaN values:")
-            print(all_nan_rows.index.tolist())
-        
+            print(all_nan_rows.tolist())
+
         # Check for rows with any NaN values
-        any_nan_rows = df[df.isna().any(axis=1)]
+        any_nan_rows = np.flatnonzero(nulls.any(axis=1))
         if len(any_nan_rows) > 0:
             print(f"Found {len(any_nan_rows)} rows with some NaN values:")
-            print("Row indices:", any_nan_rows.index.tolist())
-            
+            print("Row indices:", any_nan_rows.tolist())
+
         print("\n" + "="*50)
-        
-        # Show unique values for categorical columns
-        categorical_cols = ['sex', 'dataset', 'cp', 'fbs', 'restecg', 'exang', 'slope', 'thal']
+
+        # Show value counts for categorical columns (decoded from the stored codes)
         print("Unique values in categorical columns:")
-        for col in categorical_cols:
-            if col in df.columns:
-                unique_vals = df[col].unique()
-                print(f"  {col}: {unique_vals}")
-        
+        for col in store.columns:
+            if "categories" in store.info(col):
+                labels, counts = np.unique(store.decoded(col).astype(str), return_counts=True)
+                print(f"  {col}: " + ", ".join(f"{label} ({count})" for label, count in zip(labels, counts)))
+
         print("\n" + "="*50)
-        
-        # Check for any non-numeric values in numeric columns
-        numeric_cols = ['age', 'trestbps', 'chol', 'thalch', 'oldpeak', 'ca', 'num']
-        print("Checking numeric columns for non-numeric values:")
-        for col in numeric_cols:
-            if col in df.columns:
-                # Try to convert to numeric and see what fails
-                numeric_series = pd.to_numeric(df[col], errors='coerce')
-                non_numeric_mask = df[col].notna() & numeric_series.isna()
-                if non_numeric_mask.any():
-                    print(f"  {col}: Non-numeric values found:")
-                    print(f"    Values: {df[col][non_numeric_mask].unique()}")
-                    print(f"    Row indices: {df[col][non_numeric_mask].index.tolist()}")
-                else:
-                    print(f"  {col}: All values are numeric or NaN")
-        
+
+        # Non-NULL values the encoder did not recognise were counted at build time
+        print("Checking columns for unrecognised values:")
+        for col in store.columns:
+            invalid = store.info(col)["invalid"]
+            if invalid:
+                print(f"  {col}: {invalid} values could not be encoded (imputed with the default)")
+            else:
+                print(f"  {col}: All values are valid or NaN")
+
     except Exception as e:
         print(f"Error analyzing CSV: {e}")
 
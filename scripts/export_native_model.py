@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Export the pickled Keras model to a memory-mappable NumPy .npz and verify it.
+
+The export holds the dense weights and folded BatchNormalization as flat
+float32 arrays (api/native_model.py), so serving it imports neither
+TensorFlow nor Keras. Exporting needs the training environment (Keras, to
+unpickle the original); the check scores data/heart.csv plus random rows
+with both models and fails unless every predicted class matches and the
+probabilities agree within --atol. Cold start time and peak memory of a
+fresh process loading each file are reported.
+
+Usage:
+    python scripts/export_native_model.py
+    MODEL_PATH=models/heart_disease_model.npz uvicorn api.main:app
+"""
+
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+
+# Add parent directory to path to import from api
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from api.feature_store import FEATURE_STORE_PATH, FeatureStore, build_from_csv
+from api.inference import classify, predict_matrix, predict_proba_matrix
+from api.native_model import export_keras_model, load_native_model
+from api.preprocessing import load_preprocessor
+
+MODEL_PATH = "models/heart_disease_model.h5.pkl"
+NATIVE_PATH = "models/heart_disease_model.npz"
+CSV_PATH = "data/heart.csv"
+ATOL = 1e-5
+
+# Runs in a fresh interpreter: load one model file, report seconds and peak RSS
+COLD_START = """
+import json, resource, sys, time
+start = time.perf_counter()
+from api.registry import deserialize_model
+path = sys.argv[1]
+with open(path, "rb") as f:
+    model = deserialize_model(path, f.read())
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def cold_start(path):
+    result = subprocess.run([sys.executable, "-c", COLD_START, path], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_matrix(csv_path, random_rows=10_000, seed=0):
+    """Encoded + scaled rows the API would feed the model: the CSV plus random perturbations"""
+    build_from_csv(csv_path, FEATURE_STORE_PATH)
+    X = FeatureStore(FEATURE_STORE_PATH).feature_matrix()
+    rng = np.random.default_rng(seed)
+    noise = X[rng.integers(0, len(X), random_rows)] * rng.uniform(0.8, 1.2, (random_rows, X.shape[1]))
+    return load_preprocessor().transform(np.vstack([X, noise]))
+
+
+def export_and_verify(model_path=MODEL_PATH, out=NATIVE_PATH, csv_path=CSV_PATH, atol=ATOL):
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    export_keras_model(model, out)
+    native = load_native_model(out)
+    print(f"✅ Exported {model_path} -> {out} ({os.path.getsize(out) / 1024:.0f} KiB, "
+          f"{len(native.layers)} layers)")
+
+    X = check_matrix(csv_path)
+    expected, actual = predict_proba_matrix(model, X), predict_proba_matrix(native, X)
+    max_diff = float(np.abs(expected - actual).max())
+    class_mismatches = int((classify(expected) != classify(actual)).sum())
+    api_mismatches = sum(a != b for a, b in zip(predict_matrix(model, X), predict_matrix(native, X)))
+    print(f"🔍 {len(X):,} rows: max |Δp| {max_diff:.2e}, {class_mismatches} class mismatches, "
+          f"{api_mismatches} API prediction mismatches")
+
+    for label, path in (("pickle", model_path), ("native", out)):
+        stats = cold_start(path)
+        print(f"⏱️  {label:<6} cold start {stats['seconds'] * 1000:>8.1f} ms, peak RSS {stats['max_rss_mb']:>7.1f} MB")
+
+    ok = max_diff <= atol and class_mismatches == 0 and api_mismatches == 0
+    print("✅ Native model matches the pickle" if ok else f"❌ Native model differs from the pickle (atol {atol})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH, help="pickled Keras model")
+    parser.add_argument("--out", default=NATIVE_PATH)
+    parser.add_argument("--csv", default=CSV_PATH, help="rows to compare predictions on")
+    parser.add_argument("--atol", type=float, default=ATOL, help="max allowed probability difference")
+    args = parser.parse_args()
+    sys.exit(0 if export_and_verify(args.model, args.out, args.csv, args.atol) else 1)
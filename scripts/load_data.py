@@ -10,101 +10,67 @@ Prerequisites
      MODIFY patient_id INT NOT NULL AUTO_INCREMENT;
 
 2. CSV file located at data/heart.csv
+
+The CSV is read, cleaned and inserted in chunks by api.loader, so memory
+stays bounded for arbitrarily large files:
+
+   python scripts/load_data.py --csv data/synthetic.csv --chunk-size 50000
+   python scripts/load_data.py --dry-run        # clean only, report rows/sec
+
+Opt-in fast path (large INSERT ... VALUES or LOAD DATA LOCAL INFILE, with
+the audit trigger deferred and patient_logs backfilled in one statement;
+needs migrations/002_patient_log_trigger_switch.sql):
+
+   python scripts/load_data.py --fast infile --defer-logs
+
+Parallel, resumable upserts keyed on the CSV id (see api/ingest.py):
+
+   python scripts/load_data.py --csv data/synthetic.csv --workers 8
 """
 
 import os
 import sys
-import pandas as pd
-import math
-from sqlalchemy import text
+import argparse
 
 # Fix module path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
-from api.database import SessionLocal  # This should now work
+from api.database import engine, SessionLocal  # This should now work
+from api.ingest import ingest_csv
+from api.loader import FAST_LOAD_METHODS, LOAD_CHUNK_SIZE, fast_load_csv, load_csv
 
 
 CSV_PATH = "data/heart.csv"
-CHUNK_SIZE = 1000        # rows per commit
-
-def as_enum(val, true_string="TRUE"):
-    """Convert various truthy values to the ENUM strings used in MySQL."""
-    return "TRUE" if str(val).upper() in {"1", "TRUE", "T", "YES"} else "FALSE"
-
-def nan_to_none(v):
-    """Return None if v is NaN; otherwise return v unchanged."""
-    return None if (isinstance(v, float) and math.isnan(v)) else v
-
-def load_heart_data():
-    df = pd.read_csv(CSV_PATH)
-    print(f"Loaded {len(df):,} rows from {CSV_PATH}")
-
-    # Pre-clean frame once so we touch each cell only a single time
-    df = df.applymap(nan_to_none)
-
-    # Replace ENUM-like columns
-    df["fbs"]   = df["fbs"].apply(as_enum)
-    df["exang"] = df["exang"].apply(as_enum)
-
-    inserted = 0
-    session  = SessionLocal()
 
+def load_heart_data(csv_path=CSV_PATH, chunk_size=LOAD_CHUNK_SIZE, dry_run=False,
+                    fast=None, defer_logs=False, workers=None):
     try:
-        insert_stmt = text("""
-            INSERT INTO patients (
-                patient_age, gender, data_source, chest_pain_type,
-                resting_blood_pressure, cholesterol_level, fasting_blood_sugar,
-                resting_ecg_results, max_heart_rate, exercise_induced_angina,
-                st_depression, exercise_peak_slope, major_vessels_count,
-                thalassemia_type, heart_disease_diagnosis
-            ) VALUES (
-                :age, :sex, :dataset, :cp,
-                :trestbps, :chol, :fbs,
-                :restecg, :thalch, :exang,
-                :oldpeak, :slope, :ca,
-                :thal, :num
-            )
-        """)
-
-        for start in range(0, len(df), CHUNK_SIZE):
-            chunk = df.iloc[start : start + CHUNK_SIZE]
-
-            # Build a list of dictionaries ready for executemany()
-            bind_params = [
-                {
-                    "age":       int(row.age),
-                    "sex":       str(row.sex),
-                    "dataset":   str(row.dataset),
-                    "cp":        str(row.cp),
-                    "trestbps":  nan_to_none(row.trestbps),
-                    "chol":      nan_to_none(row.chol),
-                    "fbs":       row.fbs,        # already TRUE/FALSE
-                    # Handle restecg: replace None/NaN with 'normal'
-                    "restecg":   str(row.restecg) if row.restecg and not pd.isna(row.restecg) else "normal",
-                    "thalch":    nan_to_none(row.thalch),
-                    "exang":     row.exang,      # already TRUE/FALSE
-                    "oldpeak":   nan_to_none(row.oldpeak),
-                    "slope":     str(row.slope) if row.slope else "flat",
-                    "ca":        nan_to_none(row.ca),
-                    "thal":      str(row.thal) if row.thal else "normal",
-                    "num":       nan_to_none(row.num),
-                }
-                for row in chunk.itertuples(index=False)
-            ]
-
-            session.execute(insert_stmt, bind_params)
-            session.commit()
-            inserted += len(bind_params)
-            print(f"✅  Inserted {inserted:,} / {len(df):,} rows")
-
-        print(f"\n🎉 Finished! {inserted:,} total rows inserted.")
+        if workers and not dry_run:
+            stats = ingest_csv(csv_path, chunk_size=chunk_size, workers=workers)
+        elif fast and not dry_run:
+            stats = fast_load_csv(csv_path, engine, chunk_size=chunk_size, method=fast,
+                                  defer_logs=defer_logs)
+        else:
+            stats = load_csv(csv_path, SessionLocal, chunk_size=chunk_size, dry_run=dry_run)
+        verb = "cleaned" if dry_run else "inserted"
+        print(f"\n🎉 Finished! {stats['rows']:,} total rows {verb} "
+              f"in {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/sec).")
+        if stats.get("logged"):
+            print(f"📝 Backfilled {stats['logged']:,} patient_logs rows.")
     except Exception as e:
-        session.rollback()
         print("❌  Aborted – rolled back last chunk.\nReason:", e)
-    finally:
-        session.close()
 
 if __name__ == "__main__":
-    load_heart_data()
+    parser = argparse.ArgumentParser(description="Load a heart-disease CSV into MySQL")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--chunk-size", type=int, default=LOAD_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="clean without inserting")
+    parser.add_argument("--fast", choices=FAST_LOAD_METHODS, help="opt-in fast load path")
+    parser.add_argument("--defer-logs", action="store_true",
+                        help="with --fast: skip the audit trigger and backfill patient_logs at the end")
+    parser.add_argument("--workers", type=int,
+                        help="parallel, resumable upserts on the CSV id with this many processes")
+    args = parser.parse_args()
+    load_heart_data(args.csv, args.chunk_size, args.dry_run, args.fast, args.defer_logs, args.workers)
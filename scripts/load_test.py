@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the FastAPI backend; reports p50/p90/p99 latency.
+
+Run it once against the old build and once against the new one, saving the
+first run and comparing the second against it:
+
+    python scripts/load_test.py --concurrency 100 --requests 5000 --save before.json
+    python scripts/load_test.py --concurrency 100 --requests 5000 --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+API_BASE_URL = "http://localhost:8000"
+DEFAULT_PATHS = ["/patients/?limit=20", "/patients/1", "/patients/latest/data"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def worker(client, paths, counter, latencies, errors):
+    while True:
+        i = counter["next"]
+        if i >= counter["total"]:
+            return
+        counter["next"] += 1
+
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if not response.is_success:  # any non-2xx, e.g. 404s from a bad path list
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load_test(base_url, paths, concurrency, total):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    counter = {"next": 0, "total": total}
+    latencies, errors = [], []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, paths, counter, latencies, errors) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else float("nan"),
+    }
+
+
+def print_report(stats, baseline=None):
+    print("\n" + "=" * 50)
+    print(f"🚦 {stats['requests']:,} requests @ concurrency {stats['concurrency']} "
+          f"in {stats['elapsed_s']:.2f}s ({stats['errors']} errors)")
+    print("=" * 50)
+    for key in ("rps", "p50_ms", "p90_ms", "p99_ms", "max_ms"):
+        line = f"{key:>8}: {stats[key]:10.2f}"
+        if baseline:
+            line += f"   (before: {baseline[key]:10.2f}, x{stats[key] / baseline[key]:.2f})"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent latency test for the API")
+    parser.add_argument("--url", default=API_BASE_URL)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="endpoint to hit (repeatable); defaults to the read endpoints")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--save", help="write results as JSON (e.g. the 'before' run)")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run_load_test(
+        args.url, args.paths or DEFAULT_PATHS, args.concurrency, args.requests
+    ))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(stats, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(stats, f, indent=2)
+        print(f"✅ Results saved to {args.save}")
@@ -1,28 +1,49 @@
 #!/usr/bin/env python3
 """
 Script to fetch latest patient data and make predictions using Keras model
+
+    python scripts/predict.py                               # latest patient
+    python scripts/predict.py --ids 1 2 3 --concurrency 8   # fetched concurrently, scored in one call
 """
 
-import requests
+import argparse
 import numpy as np
-import pandas as pd
 from datetime import datetime
 import sys
 import os
 from pymongo import MongoClient
-import tensorflow as tf
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-import pickle
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-API_BASE_URL = "http://localhost:8000"
+from api.audit import PredictionLogger
+from api.client import FETCH_CONCURRENCY, APIClient, APIError
+from api.features import encode_record
+from api.inference import classify
+from api.native_model import load_native_model
+from api.preprocessing import load_preprocessor
+
 MONGO_URL = "mongodb://localhost:27017/"
+NATIVE_MODEL_PATH = "models/heart_disease_model.npz"
+
+# One client for the whole run; predictions are written in the background
+mongo_client = MongoClient(MONGO_URL)
+prediction_log = PredictionLogger(mongo_client["heart_disease_predictor"]["predictions"])
+
+# Pooled keep-alive connections to the API (API_BASE_URL in .env)
+api_client = APIClient()
+
+# Training-time scaling statistics, loaded once
+preprocessor = load_preprocessor()
 
 def load_keras_model():
-    """Load the trained Keras model"""
+    """Load the trained model: the NumPy export if there is one, else the Keras file"""
     try:
+        if os.path.exists(NATIVE_MODEL_PATH):
+            model = load_native_model(NATIVE_MODEL_PATH)
+            print("✅ Native model loaded successfully")
+            return model
+        import tensorflow as tf  # only needed without the export
         model = tf.keras.models.load_model('models/heart_disease_model.h5')
         print("✅ Keras model loaded successfully")
         return model
@@ -33,84 +54,22 @@ def load_keras_model():
 def fetch_latest_patient():
     """Fetch the latest patient data from API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/patients/latest/data")
-        if response.status_code == 200:
-            return response.json()
+        return api_client.latest_patient()
+    except APIError as e:
+        if e.status_code is None:
+            print("❌ Cannot connect to API. Make sure the FastAPI server is running.")
         else:
-            print(f"❌ Error fetching patient data: {response.status_code}")
-            return None
-    except requests.exceptions.ConnectionError:
-        print("❌ Cannot connect to API. Make sure the FastAPI server is running.")
+            print(f"❌ Error fetching patient data: {e.status_code}")
         return None
 
 def preprocess_patient_data(patient_data):
     """Preprocess patient data for Keras model prediction"""
     try:
-        # Create a DataFrame with the patient data
-        df = pd.DataFrame([patient_data])
-        
-        # Encode categorical variables
-        # Sex: Male=1, Female=0
-        df['sex_encoded'] = df['sex'].map({'Male': 1, 'Female': 0})
-        
-        # Chest pain type encoding
-        cp_mapping = {
-            'typical angina': 0,
-            'atypical angina': 1, 
-            'non-anginal': 2,
-            'asymptomatic': 3
-        }
-        df['cp_encoded'] = df['cp'].map(cp_mapping)
-        
-        # FBS: boolean to int
-        df['fbs_encoded'] = df['fbs'].astype(int)
-        
-        # Rest ECG encoding
-        restecg_mapping = {
-            'normal': 0,
-            'st-t abnormality': 1,
-            'lv hypertrophy': 2
-        }
-        df['restecg_encoded'] = df['restecg'].map(restecg_mapping)
-        
-        # Exercise induced angina
-        df['exang_encoded'] = df['exang'].astype(int)
+        # Encode categoricals / impute missing values with the shared encoder
+        X = np.array([encode_record(patient_data)], dtype=np.float64)
         
-        # Slope encoding
-        slope_mapping = {
-            'upsloping': 0,
-            'flat': 1,
-            'downsloping': 2
-        }
-        df['slope_encoded'] = df['slope'].map(slope_mapping).fillna(1)  # Default to flat
-        
-        # Thal encoding
-        thal_mapping = {
-            'normal': 0,
-            'fixed defect': 1,
-            'reversable defect': 2
-        }
-        df['thal_encoded'] = df['thal'].map(thal_mapping).fillna(0)  # Default to normal
-        
-        # Handle missing CA values
-        df['ca'] = df['ca'].fillna(0)
-        
-        # Select features for prediction (adjust based on your model's input)
-        features = [
-            'age', 'sex_encoded', 'cp_encoded', 'trestbps', 'chol',
-            'fbs_encoded', 'restecg_encoded', 'thalch', 'exang_encoded',
-            'oldpeak', 'slope_encoded', 'ca', 'thal_encoded'
-        ]
-        
-        # Create feature vector
-        X = df[features].values
-        
-        # Normalize the features (you might need to adjust this based on your training)
-        # For now, we'll use simple standardization
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        return X_scaled
+        # Scale with the statistics saved at training time
+        return preprocessor.transform(X)
         
     except Exception as e:
         print(f"❌ Error preprocessing data: {e}")
@@ -142,7 +101,7 @@ def make_prediction():
     # Make prediction
     print("🔄 Making prediction...")
     prediction_prob = model.predict(X)[0][0]
-    prediction = 1 if prediction_prob > 0.5 else 0
+    prediction = int(classify(prediction_prob))
     
     # Interpret prediction
     risk_level = "High Risk" if prediction == 1 else "Low Risk"
@@ -158,27 +117,21 @@ def make_prediction():
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*50)
     
-    # Store prediction in MongoDB
-    try:
-        mongo_client = MongoClient(MONGO_URL)
-        mongo_db = mongo_client["heart_disease_predictor"]
-        
-        prediction_doc = {
-            "patient_id": patient_data['id'],
-            "prediction": int(prediction),
-            "probability": float(prediction_prob),
-            "confidence": float(confidence),
-            "risk_level": risk_level,
-            "timestamp": datetime.now(),
-            "patient_data": patient_data,
-            "model_type": "keras_neural_network"
-        }
-        
-        result = mongo_db.predictions.insert_one(prediction_doc)
-        print(f"✅ Prediction stored in MongoDB with ID: {result.inserted_id}")
-        
-    except Exception as e:
-        print(f"⚠️ Warning: Could not store prediction in MongoDB: {e}")
+    # Queue prediction for MongoDB (written by the background logger)
+    prediction_doc = {
+        "patient_id": patient_data['id'],
+        "prediction": int(prediction),
+        "probability": float(prediction_prob),
+        "confidence": float(confidence),
+        "risk_level": risk_level,
+        "timestamp": datetime.now(),
+        "patient_data": patient_data,
+        "model_type": "keras_neural_network"
+    }
+    if prediction_log.log(prediction_doc):
+        print("✅ Prediction queued for MongoDB")
+    else:
+        print("⚠️ Warning: Prediction log queue is full, prediction not stored")
     
     return {
         "patient_id": patient_data['id'],
@@ -187,5 +140,62 @@ def make_prediction():
         "risk_level": risk_level
     }
 
+def predict_patients(ids, concurrency=FETCH_CONCURRENCY):
+    """Fetch `ids` concurrently and score them all with one predict call"""
+    model = load_keras_model()
+    if model is None:
+        return
+
+    print(f"🔄 Fetching {len(ids)} patients ({concurrency} at a time)...")
+    try:
+        patients = api_client.fetch_patients(ids, concurrency=concurrency)
+    except APIError as e:
+        print(f"❌ Error fetching patient data: {e}")
+        return
+    missing = [pid for pid, patient in zip(ids, patients) if patient is None]
+    if missing:
+        print(f"⚠️ Not found: {missing}")
+    patients = [patient for patient in patients if patient is not None]
+    if not patients:
+        return
+
+    X = preprocessor.transform(np.array([encode_record(p) for p in patients], dtype=np.float64))
+    probabilities = np.asarray(model.predict(X), dtype=np.float64).reshape(len(X), -1)[:, 0]
+
+    now = datetime.now()
+    documents = []
+    for patient, prob, prediction in zip(patients, probabilities, classify(probabilities).tolist()):
+        risk_level = "High Risk" if prediction == 1 else "Low Risk"
+        print(f"Patient {patient['id']:>8}: {risk_level:<9} (probability {prob:.4f})")
+        documents.append({
+            "patient_id": patient['id'],
+            "prediction": prediction,
+            "probability": float(prob),
+            "confidence": float(prob if prediction == 1 else 1 - prob),
+            "risk_level": risk_level,
+            "timestamp": now,
+            "patient_data": patient,
+            "model_type": "keras_neural_network"
+        })
+    queued = prediction_log.log_many(documents)
+    print(f"✅ {queued} of {len(documents)} predictions queued for MongoDB")
+    return documents
+
+def flush_prediction_log():
+    """Write any queued predictions before exiting"""
+    prediction_log.close()
+    stats = prediction_log.stats()
+    if stats["failed_documents"]:
+        print(f"⚠️ Warning: Could not store {stats['failed_documents']} prediction(s) in MongoDB")
+
 if __name__ == "__main__":
-    make_prediction()
+    parser = argparse.ArgumentParser(description="Fetch patients from the API and predict heart disease")
+    parser.add_argument("--ids", type=int, nargs="+", help="patient ids to score (default: the latest patient)")
+    parser.add_argument("--concurrency", type=int, default=FETCH_CONCURRENCY, help="requests in flight")
+    args = parser.parse_args()
+    if args.ids:
+        predict_patients(args.ids, args.concurrency)
+    else:
+        make_prediction()
+    api_client.close()
+    flush_prediction_log()
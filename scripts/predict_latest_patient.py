@@ -4,94 +4,74 @@ Script to predict heart disease on the latest patient using a saved Keras model.
 """
 
 import os, sys
-import requests
 import pickle
 import numpy as np
-import pandas as pd
 from datetime import datetime
 from pymongo import MongoClient
-from sklearn.preprocessing import StandardScaler
 
 # Load project paths
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from api.database import SessionLocal
+from api.audit import PredictionLogger
+from api.client import APIClient, APIError
+from api.features import encode_record
+from api.inference import classify
+from api.native_model import load_native_model
+from api.preprocessing import load_preprocessor
 
 # Constants
-API_BASE_URL = "http://127.0.0.1:8000"
 MODEL_PATH = "models/heart_disease_model.h5.pkl"
+NATIVE_MODEL_PATH = "models/heart_disease_model.npz"
 MONGO_URL = "mongodb://localhost:27017/"
 
+# One client for the whole run; predictions are written in the background
+mongo_client = MongoClient(MONGO_URL)
+prediction_log = PredictionLogger(mongo_client["heart_disease_predictor"]["predictions"])
+
+# Pooled keep-alive connections with retries (API_BASE_URL in .env)
+api_client = APIClient()
+
+# Training-time scaling statistics, loaded once
+preprocessor = load_preprocessor()
+
 def fetch_latest_patient():
     print("📥 Fetching latest patient...")
     try:
-        res = requests.get(f"{API_BASE_URL}/patients/latest/data")
-        if res.status_code == 200:
-            return res.json()
+        return api_client.latest_patient()
+    except APIError as e:
+        if e.status_code is None:
+            print(f"❌ Error connecting to API: {e}")
         else:
-            print(f"❌ Failed to fetch: Status code {res.status_code}")
-            return None
-    except Exception as e:
-        print(f"❌ Error connecting to API: {e}")
+            print(f"❌ Failed to fetch: Status code {e.status_code}")
         return None
 
 def preprocess(patient):
     print("🔄 Preprocessing patient data...")
-    df = pd.DataFrame([patient])
-
-    # Mapping for encoding categorical fields
-    mappings = {
-        'sex': {'Male': 1, 'Female': 0},
-        'cp': {'typical angina': 0, 'atypical angina': 1, 'non-anginal': 2, 'asymptomatic': 3},
-        'restecg': {'normal': 0, 'st-t abnormality': 1, 'lv hypertrophy': 2},
-        'slope': {'upsloping': 0, 'flat': 1, 'downsloping': 2},
-        'thal': {'normal': 0, 'fixed defect': 1, 'reversable defect': 2},
-        'fbs': {'FALSE': 0, 'TRUE': 1},
-        'exang': {'FALSE': 0, 'TRUE': 1},
-    }
-
-    # Encode all required fields
-    df['sex_encoded'] = df['sex'].map(mappings['sex'])
-    df['cp_encoded'] = df['cp'].map(mappings['cp'])
-    df['fbs_encoded'] = df['fbs'].map(mappings['fbs'])
-    df['restecg_encoded'] = df['restecg'].map(mappings['restecg'])
-    df['exang_encoded'] = df['exang'].map(mappings['exang'])
-    df['slope_encoded'] = df['slope'].map(mappings['slope']).fillna(1)
-    df['thal_encoded'] = df['thal'].map(mappings['thal']).fillna(0)
-    df['ca'] = df['ca'].fillna(0)
-
-    features = [
-        'age', 'sex_encoded', 'cp_encoded', 'trestbps', 'chol', 'fbs_encoded',
-        'restecg_encoded', 'thalch', 'exang_encoded', 'oldpeak', 'slope_encoded',
-        'ca', 'thal_encoded'
-    ]
-
-    X = df[features].values
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    return X_scaled
+    X = np.array([encode_record(patient)], dtype=np.float64)
+    return preprocessor.transform(X)
 
 def load_model():
     print("📦 Loading model...")
+    if os.path.exists(NATIVE_MODEL_PATH):
+        return load_native_model(NATIVE_MODEL_PATH)  # no TensorFlow import
     with open(MODEL_PATH, "rb") as f:
         return pickle.load(f)
 
 def store_prediction_in_mongo(patient_id, pred, prob, confidence, risk_level, patient_data):
-    try:
-        mongo = MongoClient(MONGO_URL)
-        collection = mongo["heart_disease_predictor"]["predictions"]
-        collection.insert_one({
-            "patient_id": patient_id,
-            "prediction": pred,
-            "probability": float(prob),
-            "confidence": float(confidence),
-            "risk_level": risk_level,
-            "timestamp": datetime.now(),
-            "patient_data": patient_data,
-            "model_type": "keras_neural_network"
-        })
-        print("✅ Stored prediction in MongoDB")
-    except Exception as e:
-        print(f"⚠️ Failed to store prediction: {e}")
+    queued = prediction_log.log({
+        "patient_id": patient_id,
+        "prediction": pred,
+        "probability": float(prob),
+        "confidence": float(confidence),
+        "risk_level": risk_level,
+        "timestamp": datetime.now(),
+        "patient_data": patient_data,
+        "model_type": "keras_neural_network"
+    })
+    if queued:
+        print("✅ Queued prediction for MongoDB")
+    else:
+        print("⚠️ Prediction log queue is full, prediction not stored")
 
 def predict_and_log():
     model = load_model()
@@ -103,7 +83,7 @@ def predict_and_log():
 
     X = preprocess(patient)
     prob = model.predict(X)[0][0]
-    pred = 1 if prob > 0.5 else 0
+    pred = int(classify(prob))
     confidence = prob if pred == 1 else (1 - prob)
     risk = "High Risk" if pred else "Low Risk"
 
@@ -119,6 +99,12 @@ def predict_and_log():
 
 def main():
     predict_and_log()
+    api_client.close()
+    # Flush queued predictions before exiting
+    prediction_log.close()
+    failed = prediction_log.stats()["failed_documents"]
+    if failed:
+        print(f"⚠️ Failed to store {failed} prediction(s)")
 
 if __name__ == "__main__":
     main()
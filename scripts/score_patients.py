@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Batch-score patients straight from MySQL into the Mongo `predictions` collection.
+
+    python scripts/score_patients.py                         # every patient
+    python scripts/score_patients.py --since last            # only rows changed since the previous run
+    python scripts/score_patients.py --since 2025-06-01T00:00:00 --workers 8 --chunk-size 50000
+
+Uses MYSQL_* / MONGO_* settings from .env (api/database.py) and the model
+served by the API (MODEL_PATH, .pkl or .npz); see api/batch_scoring.py.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.batch_scoring import SCORE_CHUNK_SIZE, score_patients
+from api.database import engine, mongo_db
+from api.inference_pool import INFERENCE_WORKERS
+from api.registry import ModelRegistry
+
+
+def parse_since(value):
+    if value is None or value == "last":
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--since must be an ISO timestamp or 'last', got {value!r}")
+
+
+def run(since=None, chunk_size=SCORE_CHUNK_SIZE, workers=INFERENCE_WORKERS):
+    handle = ModelRegistry().get()
+    print(f"📦 Scoring with model version {handle.version}"
+          + (f", rows updated since {since}" if since else ", all patients"))
+
+    stats = score_patients(engine, mongo_db["predictions"], handle, mongo_db["sync_state"],
+                           since=since, chunk_size=chunk_size, workers=workers)
+    if stats["rows"]:
+        print(f"🎉 Scored {stats['rows']:,} patients ({stats['written']:,} predictions written) "
+              f"in {stats['seconds']:.1f}s, {stats['rows_per_sec']:,.0f} rows/sec; "
+              f"newest record_updated_at {stats['high_water_mark']}")
+    else:
+        print("No patients to score")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--since", type=parse_since,
+                        help="only rows with record_updated_at at/after this ISO timestamp, or 'last'")
+    parser.add_argument("--chunk-size", type=int, default=SCORE_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS,
+                        help="inference worker processes (1 = score in this process)")
+    args = parser.parse_args()
+    run(args.since, args.chunk_size, args.workers)
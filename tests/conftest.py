@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import the api package from the repository root, as the scripts do
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
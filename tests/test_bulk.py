@@ -0,0 +1,113 @@
+"""
+Chunk INSERT fallback of ingest_patients (api/bulk.py) against a stub of
+insert_patients that rejects marked rows the way MySQL would.
+"""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from api import bulk
+
+DUPLICATE = "(1062, \"Duplicate entry 'x' for key 'patients.PRIMARY'\")"
+FOREIGN_KEY = ("(1452, 'Cannot add or update a child row: a foreign key constraint fails "
+               "(`heart`.`patients`, CONSTRAINT `fk_patients_cp` FOREIGN KEY (`chest_pain_type`) "
+               "REFERENCES `cp` (`description`))')")
+
+
+class StubDB:
+    """AsyncDBSession stand-in; counts INSERT round trips"""
+
+    def __init__(self):
+        self.inserts = 0
+        self.next_id = 1
+
+    async def run_sync(self, fn, *args):
+        return fn(self, *args)
+
+
+def stub_insert(bad_ages, error=IntegrityError):
+    """insert_patients replacement: a chunk holding a `bad_ages` row fails as a whole"""
+    def insert(db, patients):
+        db.inserts += 1
+        for patient in patients:
+            if patient.age in bad_ages:
+                raise error("INSERT INTO patients ... secret SQL", {}, Exception(bad_ages[patient.age]))
+        first_id = db.next_id
+        db.next_id += len(patients)
+        return list(range(first_id, db.next_id))
+    return insert
+
+
+PATIENT = {"sex": "Male", "dataset": "Cleveland", "cp": "typical angina", "trestbps": 145,
+           "chol": 233, "fbs": "TRUE", "restecg": "lv hypertrophy", "thalch": 150, "exang": "FALSE",
+           "oldpeak": 2.3, "slope": "downsloping", "ca": 0, "thal": "fixed defect", "num": 0}
+
+
+def body(ages):
+    async def stream():
+        for age in ages:
+            yield (json.dumps({**PATIENT, "age": age}) + "\n").encode()
+    return stream()
+
+
+def ingest(ages, db, **kwargs):
+    return asyncio.run(bulk.ingest_patients(body(ages), "ndjson", db, **kwargs))
+
+
+def test_clean_chunks_are_one_insert_each(monkeypatch):
+    monkeypatch.setattr(bulk, "insert_patients", stub_insert({}))
+    db = StubDB()
+    summary = ingest([40] * 10, db, chunk_size=4)
+    assert summary["inserted"] == 10 and summary["failed"] == 0
+    assert db.inserts == 3
+    assert [r["id"] for r in summary["results"]] == list(range(1, 11))
+
+
+def test_failed_chunk_is_bisected_down_to_the_bad_rows(monkeypatch):
+    monkeypatch.setattr(bulk, "insert_patients", stub_insert({99: DUPLICATE, 98: FOREIGN_KEY}))
+    db = StubDB()
+    ages = [40] * 64
+    ages[10], ages[50] = 99, 98
+    summary = ingest(ages, db, chunk_size=64)
+
+    assert summary["inserted"] == 62 and summary["failed"] == 2
+    errors = {r["row"]: r["error"] for r in summary["results"] if "error" in r}
+    assert errors == {11: "insert failed: duplicate key patients.PRIMARY",
+                      51: "insert failed: violates constraint fk_patients_cp"}
+    assert db.inserts < 2 * 2 * 6 + 1  # ~2k*log2(n) + the chunk itself, not one per row
+    assert [r["row"] for r in summary["results"]] == list(range(1, 65))
+
+
+def test_unrecognised_integrity_error_is_not_leaked(monkeypatch):
+    monkeypatch.setattr(bulk, "insert_patients", stub_insert({99: "(3819, 'Check constraint violated')"}))
+    summary = ingest([40, 99, 40], StubDB())
+    assert summary["results"][1] == {"row": 2, "error": "insert failed: duplicate/constraint violation"}
+
+
+def test_connection_errors_fail_the_chunk_without_bisecting(monkeypatch):
+    monkeypatch.setattr(bulk, "insert_patients", stub_insert({99: "Lost connection"}, error=OperationalError))
+    db = StubDB()
+    summary = ingest([40, 99, 40, 40], db, chunk_size=4)
+    assert db.inserts == 1
+    assert summary["failed"] == 4
+    assert {r["error"] for r in summary["results"]} == {"insert failed"}
+
+
+@pytest.mark.parametrize("predict_async", [False, True])
+def test_predictions_only_for_inserted_rows(monkeypatch, predict_async):
+    monkeypatch.setattr(bulk, "insert_patients", stub_insert({99: DUPLICATE}))
+    sizes = []
+
+    def predict(X):
+        sizes.append(len(X))
+        return [1] * len(X)
+
+    async def apredict(X):
+        return predict(X)
+
+    summary = ingest([40, 99, 40], StubDB(), predict=apredict if predict_async else predict)
+    assert sizes == [2]
+    assert [r.get("prediction") for r in summary["results"]] == [1, None, 1]
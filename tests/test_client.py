@@ -0,0 +1,218 @@
+"""
+APIClient / AsyncAPIClient (api/client.py) against an httpx.MockTransport
+stub of the patient routes.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from api import client as client_module
+from api.client import APIClient, APIError, AsyncAPIClient
+
+KNOWN_IDS = set(range(1, 21))
+
+
+class StubAPI:
+    """GET /patients/{id}: 404 for unknown ids, optional failures before success"""
+
+    def __init__(self, failures=(), retry_after=None, delay=0.0):
+        self.failures = list(failures)  # status codes returned before the real answer
+        self.retry_after = retry_after
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.failures.pop(0) if self.failures else None
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _respond(self, request, failure):
+        if failure is not None:
+            headers = {"Retry-After": self.retry_after} if self.retry_after is not None else {}
+            return httpx.Response(failure, headers=headers, json={"detail": "try again"})
+        patient_id = int(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        if patient_id not in KNOWN_IDS:
+            return httpx.Response(404, json={"detail": "Patient not found"})
+        return httpx.Response(200, json={"id": patient_id, "prediction": patient_id % 2})
+
+    def sync_transport(self):
+        def handler(request):
+            failure = self._enter()
+            try:
+                if self.delay:
+                    time.sleep(self.delay)
+                return self._respond(request, failure)
+            finally:
+                self._leave()
+        return httpx.MockTransport(handler)
+
+    def async_transport(self):
+        async def handler(request):
+            failure = self._enter()
+            try:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                return self._respond(request, failure)
+            finally:
+                self._leave()
+        return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the client's retry delays instead of sleeping"""
+    recorded = []
+    monkeypatch.setattr(client_module, "time", SimpleNamespace(sleep=recorded.append))
+    return recorded
+
+
+def sync_client(stub, **kwargs):
+    return APIClient(base_url="http://stub", transport=stub.sync_transport(), backoff=0.01, **kwargs)
+
+
+def async_client(stub, **kwargs):
+    return AsyncAPIClient(base_url="http://stub", transport=stub.async_transport(), backoff=0.0, **kwargs)
+
+
+# ------------------------------------------------------------------
+# APIClient
+# ------------------------------------------------------------------
+def test_get_patient_and_unknown_id():
+    stub = StubAPI()
+    with sync_client(stub) as api:
+        assert api.get_patient(3) == {"id": 3, "prediction": 1}
+        assert api.get_patient(999) is None
+
+
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+def test_retries_transient_status_then_succeeds(status, sleeps):
+    stub = StubAPI(failures=[status, status])
+    with sync_client(stub, retries=3) as api:
+        assert api.get_patient(1)["id"] == 1
+    assert stub.calls == 3
+    assert len(sleeps) == 2
+    assert sleeps[1] > sleeps[0] * 0.5 > 0  # backoff grows (up to jitter)
+
+
+def test_gives_up_after_retries(sleeps):
+    stub = StubAPI(failures=[503] * 10)
+    with sync_client(stub, retries=2) as api:
+        with pytest.raises(APIError) as excinfo:
+            api.get_patient(1)
+    assert excinfo.value.status_code == 503
+    assert stub.calls == 3
+
+
+def test_does_not_retry_client_errors(sleeps):
+    stub = StubAPI(failures=[400])
+    with sync_client(stub) as api:
+        with pytest.raises(APIError):
+            api.get_patient(1)
+    assert stub.calls == 1 and sleeps == []
+
+
+def test_honours_retry_after_seconds(sleeps):
+    stub = StubAPI(failures=[429], retry_after="2")
+    with sync_client(stub) as api:
+        assert api.get_patient(1)["id"] == 1
+    assert sleeps == [2.0]
+
+
+def test_honours_retry_after_http_date(sleeps):
+    stub = StubAPI(failures=[503], retry_after="Wed, 21 Oct 2015 07:28:00 GMT")  # in the past
+    with sync_client(stub) as api:
+        assert api.get_patient(1)["id"] == 1
+    assert sleeps == [0.0]
+
+
+def test_transport_errors_are_retried(sleeps):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"id": 1})
+
+    with APIClient(base_url="http://stub", transport=httpx.MockTransport(handler), backoff=0.01) as api:
+        assert api.get_patient(1) == {"id": 1}
+    assert len(attempts) == 2 and len(sleeps) == 1
+
+
+def test_fetch_patients_keeps_order_and_bounds_concurrency():
+    stub = StubAPI(delay=0.02)
+    ids = [5, 999, 1, 20, 7, 3, 12, 1000, 2, 9, 4, 6]
+    with sync_client(stub, concurrency=8) as api:
+        patients = api.fetch_patients(ids, concurrency=4)
+    assert [p["id"] if p else None for p in patients] == [i if i in KNOWN_IDS else None for i in ids]
+    assert 1 < stub.max_in_flight <= 4
+
+
+# ------------------------------------------------------------------
+# AsyncAPIClient
+# ------------------------------------------------------------------
+def test_async_get_patient_and_unknown_id():
+    async def run():
+        async with async_client(StubAPI()) as api:
+            return await api.get_patient(4), await api.get_patient(999)
+
+    assert asyncio.run(run()) == ({"id": 4, "prediction": 0}, None)
+
+
+def test_async_retries_and_honours_retry_after(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def record_sleep(seconds):
+        delays.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(client_module.asyncio, "sleep", record_sleep)
+    stub = StubAPI(failures=[502, 429], retry_after="1.5")
+
+    async def run():
+        async with async_client(stub, retries=3) as api:
+            return await api.get_patient(2)
+
+    assert asyncio.run(run())["id"] == 2
+    assert stub.calls == 3
+    assert delays == [1.5, 1.5]
+
+
+def test_async_gives_up_after_retries():
+    stub = StubAPI(failures=[504] * 10)
+
+    async def run():
+        async with async_client(stub, retries=1) as api:
+            return await api.get_patient(1)
+
+    with pytest.raises(APIError):
+        asyncio.run(run())
+    assert stub.calls == 2
+
+
+def test_async_fetch_patients_keeps_order_and_bounds_concurrency():
+    stub = StubAPI(delay=0.02)
+    ids = list(range(25, 0, -1)) + [404]
+
+    async def run():
+        async with async_client(stub, concurrency=16) as api:
+            return await api.fetch_patients(ids, concurrency=5)
+
+    patients = asyncio.run(run())
+    assert [p["id"] if p else None for p in patients] == [i if i in KNOWN_IDS else None for i in ids]
+    assert 1 < stub.max_in_flight <= 5
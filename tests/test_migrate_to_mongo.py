@@ -0,0 +1,114 @@
+"""
+migrate_all (api/mongo_sync.py) against a seeded SQLite copy of the
+patients tables and a mongomock collection standing in for Mongo.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from pymongo import ReplaceOne
+from sqlalchemy import create_engine, text
+
+mongomock = pytest.importorskip("mongomock")
+
+from api.models import PATIENT_COLUMNS
+from api.mongo_sync import SYNC_STATE_ID, migrate_all
+
+ROWS = 50
+BATCH_SIZE = 7
+
+
+class RecordingCollection:
+    """
+    mongomock collection that records the size of every write call.
+
+    mongomock's own bulk_write predates the `sort` argument newer pymongo
+    passes for ReplaceOne, so replacements are applied one by one here.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.batches = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.batches.append(len(requests))
+        upserted = modified = 0
+        for request in requests:
+            assert isinstance(request, ReplaceOne) and request._upsert
+            result = self.collection.replace_one(request._filter, request._doc, upsert=True)
+            upserted += result.upserted_id is not None
+            modified += result.modified_count
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    def insert_many(self, documents, ordered=True):
+        self.batches.append(len(documents))
+        return self.collection.insert_many(documents, ordered=ordered)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'patients.db'}",
+                           connect_args={"detect_types": sqlite3.PARSE_DECLTYPES})
+    columns = ", ".join(f"{column} TEXT" for column in PATIENT_COLUMNS.values())
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE patients (patient_id INTEGER PRIMARY KEY, {columns}, "
+            "record_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+            "record_updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text("CREATE TABLE patient_logs (log_id INTEGER PRIMARY KEY, patient_id INT)"))
+        conn.execute(text("CREATE TABLE patient_deletions (deletion_id INTEGER PRIMARY KEY, patient_id INT)"))
+        for patient_id in range(1, ROWS + 1):
+            conn.execute(text("INSERT INTO patients (patient_id, patient_age, gender) VALUES (:id, :age, 'Male')"),
+                         {"id": patient_id, "age": 30 + patient_id % 40})
+            conn.execute(text("INSERT INTO patient_logs (patient_id) VALUES (:id)"), {"id": patient_id})
+    return engine
+
+
+@pytest.fixture
+def mongo():
+    return mongomock.MongoClient().heart_disease_predictor
+
+
+def test_migrate_all_copies_every_row_in_batches(engine, mongo):
+    collection = RecordingCollection(mongo.patients)
+
+    stats = migrate_all(engine, collection, mongo.sync_state, batch_size=BATCH_SIZE, writers=3)
+
+    assert stats["rows"] == ROWS
+    assert stats["written"] == ROWS
+    assert mongo.patients.count_documents({}) == ROWS
+    assert sorted(collection.batches) == sorted([BATCH_SIZE] * (ROWS // BATCH_SIZE) + [ROWS % BATCH_SIZE])
+    doc = mongo.patients.find_one({"patient_id": 2})
+    assert doc["age"] == "32" and doc["sex"] == "Male" and doc["created_at"]
+
+    state = mongo.sync_state.find_one({"_id": SYNC_STATE_ID})
+    assert state["log_id"] == ROWS
+    assert state["deletion_id"] == 0
+
+
+def test_migrate_all_rerun_is_idempotent(engine, mongo):
+    migrate_all(engine, RecordingCollection(mongo.patients), batch_size=BATCH_SIZE)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE patients SET patient_age = 99 WHERE patient_id = 5"))
+
+    stats = migrate_all(engine, RecordingCollection(mongo.patients), batch_size=BATCH_SIZE)
+
+    assert stats["rows"] == ROWS
+    assert stats["written"] == 1  # only the changed row is rewritten
+    assert mongo.patients.count_documents({}) == ROWS
+    assert mongo.patients.find_one({"patient_id": 5})["age"] == "99"
+
+
+def test_migrate_all_insert_mode_into_empty_collection(engine, mongo):
+    collection = RecordingCollection(mongo.patients)
+
+    stats = migrate_all(engine, collection, batch_size=BATCH_SIZE, writers=2, upsert=False)
+
+    assert stats["written"] == ROWS
+    assert mongo.patients.count_documents({}) == ROWS
+    assert sum(collection.batches) == ROWS and max(collection.batches) == BATCH_SIZE